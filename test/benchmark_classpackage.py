@@ -0,0 +1,74 @@
+"""Benchmark attribute access through :class:`zetup.classpackage` wrappers.
+
+Compares direct access of class members with access delegated through the
+class package wrapper, with and without ``cache_members=True``, and prints
+the best timings. Not collected by pytest, since timings are no stable pass
+criteria. Run it directly, with zetup installed or from the project root::
+
+   PYTHONPATH=. python test/benchmark_classpackage.py [NUMBER]
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+from __future__ import print_function
+
+import sys
+import shutil
+import timeit
+from tempfile import mkdtemp
+
+from path import Path
+
+
+def make_classpkg(root, name, args):
+    """Create and import a top-level package `name` in `root`
+       with a class package ``Class``, created with the ``zetup.classpackage``
+       `args` source code, and with a member module defining ``method``.
+    """
+    pkgdir = root / name
+    (pkgdir / 'Class').makedirs()
+    (pkgdir / '__init__.py').write_text(
+        "import zetup\n"
+        "zetup.package(__name__, ['Class'])\n")
+    (pkgdir / 'Class' / '__init__.py').write_text(
+        "import zetup\n"
+        "zetup.classpackage(__name__, %s)\n"
+        "class Class(zetup.object):\n"
+        "    pass\n" % args)
+    (pkgdir / 'Class' / 'methods.py').write_text(
+        "from . import Class\n"
+        "@Class.member\n"
+        "def method(self):\n"
+        "    pass\n")
+    # the class package is imported on first access
+    __import__(name).Class
+    return sys.modules['%s.Class' % name]
+
+
+def main(number=100000):
+    root = Path(mkdtemp())
+    sys.path.insert(0, root)
+    try:
+        uncached = make_classpkg(
+            root, 'uncachedpkg', "membermodules=['methods']")
+        cached = make_classpkg(
+            root, 'cachedpkg', "membermodules=['methods'], cache_members=True")
+        Class = uncached.Class
+
+        def best(stmt):
+            return min(timeit.repeat(stmt, number=number, repeat=5))
+
+        direct = best(lambda: Class.method)
+        print("%-26s %.4fs" % ("direct", direct))
+        for label, stmt in [
+                ("delegated", lambda: uncached.method),
+                ("delegated (cache_members)", lambda: cached.method),
+        ]:
+            seconds = best(stmt)
+            print("%-26s %.4fs  %5.1fx" % (label, seconds, seconds / direct))
+    finally:
+        sys.path.remove(root)
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
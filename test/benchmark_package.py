@@ -0,0 +1,56 @@
+"""Benchmark API member access through :class:`zetup.package` wrappers.
+
+Compares plain module attribute access with cached and with uncached member
+resolution of the package wrapper, and prints the best timings. Not collected
+by pytest, since timings are no stable pass criteria. Run it directly, with
+zetup installed or from the project root::
+
+   PYTHONPATH=. python test/benchmark_package.py [NUMBER]
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+from __future__ import print_function
+
+import sys
+import shutil
+import timeit
+from tempfile import mkdtemp
+
+from path import Path
+
+
+def main(number=100000):
+    root = Path(mkdtemp())
+    (root / 'benchpkg').mkdir()
+    (root / 'benchpkg' / '__init__.py').write_text(
+        "import zetup\n"
+        "zetup.package(__name__, ['func'])\n"
+        "def func():\n"
+        "    pass\n")
+    sys.path.insert(0, root)
+    try:
+        benchpkg = __import__('benchpkg')
+        plain = benchpkg.__module__
+
+        def best(stmt):
+            return min(timeit.repeat(stmt, number=number, repeat=5))
+
+        def uncached():
+            benchpkg.__refresh__()
+            return benchpkg.func
+
+        direct = best(lambda: plain.func)
+        print("%-10s %.4fs" % ("plain", direct))
+        for label, stmt in [
+                ("cached", lambda: benchpkg.func),
+                ("uncached", uncached),
+        ]:
+            seconds = best(stmt)
+            print("%-10s %.4fs  %5.1fx" % (label, seconds, seconds / direct))
+    finally:
+        sys.path.remove(root)
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -61,3 +61,28 @@ def notebook(zfg, in_repo, in_site_packages):
         return None
 
     return zfg.NOTEBOOKS['README']
+
+
+@pytest.fixture
+def cache_dir(tmpdir, monkeypatch):
+    """A temporary persistent zetup cache directory.
+    """
+    path = Path(str(tmpdir.mkdir('cache')))
+    monkeypatch.setenv('ZETUP_CACHE_DIR', str(path))
+    monkeypatch.delenv('ZETUP_NO_CACHE', raising=False)
+    monkeypatch.delenv('ZETUP_NO_CONFIG_CACHE', raising=False)
+    return path
+
+
+@pytest.fixture
+def project(tmpdir):
+    """A minimal zetup project directory.
+    """
+    path = Path(str(tmpdir.mkdir('project')))
+    (path / 'zetuprc').write_text("[project]\n\ndescription = Test\n")
+    (path / 'VERSION').write_text("1.0\n")
+    (path / 'requirements.txt').write_text("path.py >= 10.3 #import path\n")
+    (path / 'requirements.extra.txt').write_text("zetup\n")
+    (path / 'project').mkdir()
+    (path / 'project' / '__init__.py').write_text("")
+    return path
@@ -0,0 +1,171 @@
+"""Test :class:`zetup.classpackage`.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+import sys
+
+import pytest
+
+import zetup
+import zetup.members
+from zetup.classpackage import lazymember
+from zetup.members import scan_members
+
+
+@pytest.fixture
+def make_classpkg(tmpdir, monkeypatch):
+    """Get a function creating and importing a top-level package
+    with a class package ``Class``.
+
+    Its member modules ``methods`` and ``properties`` add ``Class.method``
+    and ``Class.prop``. The function takes the ``zetup.classpackage()``
+    arguments following the package name as source code string.
+    """
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    def make_classpkg(args="membermodules=['methods', 'properties']"):
+        pkgdir = tmpdir.mkdir('classpkg')
+        pkgdir.join('__init__.py').write(
+            "import zetup\n"
+            "zetup.package(__name__, ['Class'])\n")
+        classdir = pkgdir.mkdir('Class')
+        classdir.join('__init__.py').write(
+            "import zetup\n"
+            "zetup.classpackage(__name__, %s)\n"
+            "class Class(zetup.object):\n"
+            "    value = 42\n" % args)
+        classdir.join('methods.py').write(
+            "from . import Class\n"
+            "@Class.member\n"
+            "def method(self):\n"
+            "    return self.value\n")
+        classdir.join('properties.py').write(
+            "from . import Class\n"
+            "@Class.member\n"
+            "@property\n"
+            "def prop(self):\n"
+            "    return self.value\n")
+        return __import__('classpkg')
+
+    yield make_classpkg
+    for name in list(sys.modules):
+        if name.split('.')[0] == 'classpkg':
+            del sys.modules[name]
+
+
+@pytest.fixture
+def classpkg(make_classpkg):
+    return make_classpkg()
+
+
+def test_classpackage(classpkg):
+    Class = classpkg.Class
+    assert isinstance(Class, type)
+    assert Class().method() == 42
+
+    wrapper = sys.modules['classpkg.Class']
+    assert isinstance(wrapper, zetup.classpackage)
+    assert wrapper.__name__ == 'classpkg.Class'
+    assert wrapper.Class is Class
+    assert wrapper.method is Class.method
+    assert wrapper.value == 42
+
+
+def test_lazy_members(make_classpkg):
+    classpkg = make_classpkg(
+        "membermodules={'methods': ['method'], 'properties': ['prop']},\n"
+        "    import_members='lazy'")
+    Class = classpkg.Class
+    assert 'classpkg.Class.methods' not in sys.modules
+    assert isinstance(Class.__dict__['method'], lazymember)
+
+    assert Class().method() == 42
+    assert 'classpkg.Class.methods' in sys.modules
+    assert 'classpkg.Class.properties' not in sys.modules
+    assert Class().prop == 42
+    assert isinstance(Class.__dict__['prop'], property)
+
+
+def test_background_members(make_classpkg):
+    classpkg = make_classpkg(
+        "membermodules={'methods': ['method'], 'properties': ['prop']},\n"
+        "    import_members='background'")
+    Class = classpkg.Class
+    # placeholders wait for the import by the background thread
+    assert Class().method() == 42
+    sys.modules['classpkg.Class'].__dict__['__thread__'].join()
+    assert isinstance(Class.__dict__['prop'], property)
+
+
+def test_scanned_lazy_members(cache_dir, make_classpkg):
+    classpkg = make_classpkg(
+        "membermodules=['methods', 'properties'], import_members='lazy'")
+    Class = classpkg.Class
+    assert 'classpkg.Class.methods' not in sys.modules
+    assert isinstance(Class.__dict__['prop'], lazymember)
+    assert Class().prop == 42
+    assert 'classpkg.Class.methods' not in sys.modules
+    assert (cache_dir / 'members').files('*.json')
+
+
+def test_scan_members(cache_dir, tmpdir, monkeypatch):
+    path = tmpdir.join('members.py')
+    path.write(
+        "from . import Class\n"
+        "@Class.member\n"
+        "def method(self):\n"
+        "    pass\n"
+        "@Class.member\n"
+        "@property\n"
+        "def prop(self):\n"
+        "    pass\n"
+        "@Other.member\n"
+        "def other(self):\n"
+        "    pass\n"
+        "def helper():\n"
+        "    pass\n")
+    assert scan_members(str(path), 'Class') == ['method', 'prop']
+    assert scan_members(str(tmpdir.join('missing.py')), 'Class') is None
+
+    # a cached index must not parse the source again
+    def parse(source, filename):
+        raise AssertionError("member module was scanned again")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(zetup.members.ast, 'parse', parse)
+        assert scan_members(str(path), 'Class') == ['method', 'prop']
+
+    # but changes of the source invalidate the index
+    path.write("@Class.member\nclass Nested(object):\n    pass\n")
+    assert scan_members(str(path), 'Class') == ['Nested']
+
+
+def test_import_members_options(make_classpkg):
+    with pytest.raises(ValueError):
+        make_classpkg("import_members='later'").Class
+
+
+def test_cache_members(make_classpkg):
+    classpkg = make_classpkg(
+        "membermodules=['methods', 'properties'], cache_members=True")
+    Class = classpkg.Class
+    wrapper = sys.modules['classpkg.Class']
+    method = Class.method
+    assert wrapper.method is method
+    assert wrapper.__dict__['__members__']['method'] is method
+
+    # cached until refreshed
+    Class.method = lambda self: 23
+    assert wrapper.method is method
+    wrapper.__refresh__()
+    assert wrapper.method is Class.method
+    assert Class().method() == 23
+    assert wrapper.Class is Class
+
+
+def test_uncached_members(classpkg):
+    Class = classpkg.Class
+    wrapper = sys.modules['classpkg.Class']
+    Class.method = lambda self: 23
+    assert wrapper.method is Class.method
+    assert not wrapper.__dict__['__members__']
@@ -0,0 +1,65 @@
+"""Test :mod:`zetup.config` loading and caching of zetup configs.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+from importlib import import_module
+
+import zetup.config
+from zetup import Zetup
+
+
+def test_cache(cache_dir, project, monkeypatch):
+    zfg = Zetup(project)
+    assert zfg.NAME == 'project'
+    assert zfg.VERSION == '1.0'
+    assert list(zfg.EXTRAS) == ['extra']
+    assert (cache_dir / 'config').files('*.json')
+
+    # a warm load must not read anything from the project directory
+    def read_zetup_config(path):
+        raise AssertionError("zetup config was not cached")
+
+    monkeypatch.setattr(
+        zetup.config, 'read_zetup_config', read_zetup_config)
+    cached = Zetup(project)
+    assert cached.config_py == zfg.config_py
+
+
+def test_cache_invalidation(cache_dir, project):
+    assert Zetup(project).VERSION == '1.0'
+    (project / 'VERSION').write_text("1.0.1\n")
+    assert Zetup(project).VERSION == '1.0.1'
+
+    assert list(Zetup(project).EXTRAS) == ['extra']
+    (project / 'requirements.other.txt').write_text("zetup\n")
+    assert list(Zetup(project).EXTRAS) == ['extra', 'other']
+
+
+def test_no_cache(cache_dir, project, monkeypatch):
+    monkeypatch.setenv('ZETUP_NO_CONFIG_CACHE', '1')
+    Zetup(project)
+    assert not (cache_dir / 'config').exists()
+
+
+def test_lazy(cache_dir, project, monkeypatch):
+    (project / 'requirements.setup.txt').write_text("setuptools\n")
+    resolved = []
+    # zetup.resolve is shadowed by the function of the same name
+    monkeypatch.setattr(
+        import_module('zetup.resolve'), 'resolve',
+        lambda reqs, egg_cache=None: resolved.append(reqs))
+
+    zfg = Zetup(project)
+    for name in ['VERSION', 'REQUIRES', 'EXTRAS', 'SETUP_REQUIRES']:
+        assert name not in vars(zfg)
+    assert not resolved
+
+    assert zfg.VERSION == '1.0'
+    assert 'VERSION' in vars(zfg)
+    assert 'EXTRAS' not in vars(zfg)
+    # setup requirements are resolved on first access
+    assert resolved == [zfg.SETUP_REQUIRES]
+
+    # the config dictionary contains all fields
+    assert 'EXTRAS' in zfg.config
+    assert not zfg.ZETUP_LAZY
@@ -0,0 +1,82 @@
+"""Test :class:`zetup.dist.Distribution`
+   and the shared :func:`zetup.installed.distribution_index`.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+from path import Path
+
+from zetup.dist import Distribution
+from zetup.installed import distribution_index
+from zetup.requires import VersionConflict
+
+import pytest
+
+
+@pytest.fixture
+def site(tmpdir, monkeypatch):
+    """A ``sys.path`` entry with a ``fake-1.0`` distribution.
+    """
+    path = Path(str(tmpdir.mkdir('site')))
+    (path / 'fake-1.0.dist-info').mkdir()
+    (path / 'fake-1.0.dist-info' / 'METADATA').write_text(
+        "Metadata-Version: 2.1\nName: fake\nVersion: 1.0\n")
+    (path / 'fake').mkdir()
+    monkeypatch.syspath_prepend(str(path))
+    distribution_index(refresh=True)
+    yield path
+    # don't leak the fake distribution into other tests
+    (path / 'fake').rmtree()
+    for metadata in path.dirs('fake*'):
+        metadata.rmtree()
+    distribution_index(refresh=True)
+
+
+def test_refresh(site):
+    index = distribution_index()
+    assert index['fake'].version == '1.0'
+
+    (site / 'fake-1.0.dist-info').rename(site / 'fake-1.1.dist-info')
+    assert index['fake'].version == '1.0'
+    assert index.refresh('Fake').version == '1.1'
+
+    (site / 'fake-1.1.dist-info').rmtree()
+    assert index.refresh('fake') is None
+    assert 'fake' not in index
+
+    (site / 'fake-2.0.dist-info').mkdir()
+    assert index.find('fake').version == '2.0'
+
+
+def test_find(site):
+    dist = Distribution('fake', version='1.0').find(site / 'fake')
+    assert dist.project_name == 'fake'
+    assert dist.location == site
+
+    assert Distribution('fake', version='1.0').find(
+        site / 'other' / 'fake') is None
+    with pytest.raises(VersionConflict) as exc:
+        Distribution('fake', version='2.0').find(site / 'fake')
+    assert "fake 1.0" in str(exc.value)
+    assert Distribution('fake', version='2.0').find(
+        site / 'fake', raise_=False) is None
+
+
+def test_find_unknown_version(site):
+    (site / 'fake-1.0.dist-info').rmtree()
+    (site / 'fake.egg-info').mkdir()
+    distribution_index(refresh=True)
+    assert distribution_index()['fake'].version is None
+
+    with pytest.raises(VersionConflict):
+        Distribution('fake', version='1.0').find(site / 'fake')
+    assert Distribution('fake', version='1.0').find(
+        site / 'fake', raise_=False) is None
+
+
+def test_find_pkg_resources_compatible(site):
+    dist = Distribution('fake', version='1.0').find(site / 'fake')
+    # like the pkg_resources.Distribution returned before
+    assert dist.project_name == 'fake'
+    assert dist.requires() == []
+    assert str(dist.parsed_version) == '1.0'
+    assert dist.egg_info == site / 'fake-1.0.dist-info'
@@ -0,0 +1,51 @@
+"""Test :class:`zetup.extras.Extras`.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+from zetup.extras import Extras
+
+
+def test_all():
+    extras = Extras([
+        ('one', "foo >= 1.0\nbar"),
+        ('two', "Foo < 3.0"),
+    ])
+    combined = extras['all']
+    assert extras['all'] is combined
+    assert [req.key for req in combined] == ['foo', 'bar']
+    assert sorted(combined['foo'].specs) == [('<', '3.0'), ('>=', '1.0')]
+    assert extras.provenance('FOO') == ['one', 'two']
+    assert extras.provenance('bar') == ['one']
+
+    extras['three'] = "baz"
+    assert extras['all'] is not combined
+    assert 'baz' in extras['all']
+    assert extras.provenance('baz') == ['three']
+
+    del extras['two']
+    assert list(extras['all']['foo'].specs) == [('>=', '1.0')]
+    assert extras.provenance('foo') == ['one']
+
+
+def test_all_markers():
+    extras = Extras([
+        ('one', "foo >= 1.0"),
+        ('two', "foo >= 2.0; python_version < '3'"),
+    ])
+    # the marker of one extra must not affect the requirement of another
+    unconditional, conditional = extras['all']
+    assert unconditional.marker is None
+    assert list(unconditional.specs) == [('>=', '1.0')]
+    assert list(conditional.specs) == [('>=', '2.0')]
+    assert extras.provenance('foo') == ['one', 'two']
+
+
+def test_all_in_place():
+    extras = Extras([('one', "foo")])
+    assert 'bar' not in extras['all']
+    reqs = extras['one']
+    reqs += "bar"
+    assert 'bar' in extras['all']
+    assert extras.provenance('bar') == ['one']
+    del reqs['foo']
+    assert 'foo' not in extras['all']
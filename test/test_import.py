@@ -0,0 +1,34 @@
+"""Test which modules ``import zetup`` loads.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+import sys
+import os
+from subprocess import Popen, PIPE
+
+#: Slow modules only needed at setup time
+SETUP_TIME_MODULES = ['pkg_resources', 'setuptools']
+
+#: zetup modules only needed on first access of API members or annotations
+LAZY_MODULES = ['zetup.zetup', 'zetup.config', 'zetup.requires']
+
+
+def imported_modules(statement):
+    """Run `statement` in a fresh interpreter
+       and get the names of all modules in ``sys.modules`` afterwards.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    process = Popen(
+        [sys.executable, '-c',
+         "%s\nimport sys\nprint('\\n'.join(sys.modules))" % statement],
+        cwd=root, stdout=PIPE, stderr=PIPE, universal_newlines=True)
+    out, err = process.communicate()
+    assert not process.returncode, err
+    return set(out.split())
+
+
+def test_import():
+    modules = imported_modules("import zetup")
+    assert 'zetup' in modules
+    for name in SETUP_TIME_MODULES + LAZY_MODULES:
+        assert name not in modules
@@ -3,9 +3,14 @@
 
 .. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
 """
+import sys
+import gc
+import weakref
 from inspect import ismodule
 from types import ModuleType
 
+import pytest
+
 import zetup
 
 
@@ -29,3 +34,216 @@ def test_zetup_toplevel(zfg, in_repo, in_site_packages):
     assert 'modules' not in dir(zetup)
     # instead it should end up in the original module's __dict__
     assert 'modules' in zetup.__module__.__dict__
+
+
+def test_lazy_package(tmpdir, monkeypatch):
+    """Test lazy API member import of :class:`zetup.package`.
+    """
+    pkgdir = tmpdir.mkdir('lazypkg')
+    pkgdir.join('__init__.py').write(
+        "import zetup\n"
+        "zetup.package(__name__, {\n"
+        "    None: ['VALUE'],\n"
+        "    'sub': ['Member'],\n"
+        "})\n"
+        "VALUE = 42\n")
+    pkgdir.join('sub.py').write("class Member(object):\n    pass\n")
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    lazypkg = __import__('lazypkg')
+    assert isinstance(lazypkg, zetup.package)
+    assert 'lazypkg.sub' not in sys.modules
+    assert sorted(lazypkg.__all__) == ['Member', 'VALUE']
+    assert lazypkg.VALUE == 42
+    assert 'lazypkg.sub' not in sys.modules
+
+    assert lazypkg.Member is sys.modules['lazypkg.sub'].Member
+    # stored in original module for direct access next time
+    assert 'Member' in vars(lazypkg.__module__)
+    del sys.modules['lazypkg'], sys.modules['lazypkg.sub']
+
+
+def test_package_cache(tmpdir, monkeypatch):
+    """Test the resolution cache of :class:`zetup.package`.
+    """
+    pkgdir = tmpdir.mkdir('cachedpkg')
+    pkgdir.join('__init__.py').write(
+        "import zetup\n"
+        "zetup.package(__name__, ['VALUE'], aliases={'ALIAS': 'VALUE'})\n"
+        "VALUE = 42\n")
+    pkgdir.join('sub.py').write("")
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    cachedpkg = __import__('cachedpkg')
+    assert cachedpkg.VALUE == cachedpkg.ALIAS == 42
+    assert cachedpkg.sub is sys.modules['cachedpkg.sub']
+    assert {'VALUE', 'ALIAS', 'sub'} <= set(cachedpkg.__cache__)
+
+    # changes of the wrapped module are still reflected
+    cachedpkg.__module__.VALUE = 23
+    assert cachedpkg.VALUE == cachedpkg.ALIAS == 23
+    del cachedpkg.__module__.VALUE
+    try:
+        cachedpkg.VALUE
+    except AttributeError:
+        pass
+    else:
+        assert False, "deleted member still accessible"
+
+    cachedpkg.__refresh__()
+    assert not cachedpkg.__cache__
+    del sys.modules['cachedpkg'], sys.modules['cachedpkg.sub']
+
+
+def test_package_names(tmpdir, monkeypatch):
+    """Test the cached ``__all__`` and ``__dir__`` of :class:`zetup.package`.
+    """
+    pkgdir = tmpdir.mkdir('namedpkg')
+    pkgdir.join('__init__.py').write(
+        "import zetup\n"
+        "zetup.package(__name__, ['b', 'a'], aliases={'c': 'a'},\n"
+        "              deprecated_aliases={'d': 'b'})\n"
+        "__all__ = ['e', 'a']\n"
+        "a = b = e = None\n")
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    namedpkg = __import__('namedpkg')
+    assert namedpkg.__all__ == ['e', 'a', 'b', 'c']
+    names = dir(namedpkg)
+    assert names == sorted(names)
+    assert {'a', 'b', 'c', 'e'} <= set(names) and 'd' not in names
+    assert namedpkg.__dir__() == names
+    assert namedpkg.__dir__() is not namedpkg.__dir__()
+
+    namedpkg.__module__.__all__.append('f')
+    assert namedpkg.__all__ == ['e', 'a', 'f', 'b', 'c']
+    assert 'f' in dir(namedpkg)
+    namedpkg.g = None
+    assert 'g' in dir(namedpkg)
+    del namedpkg.g
+    assert 'g' not in dir(namedpkg)
+    del sys.modules['namedpkg']
+
+
+def test_package_cache_hits(tmpdir, monkeypatch):
+    """Check that cached :class:`zetup.package` member access
+       doesn't resolve members again.
+
+    Timings are compared by ``test/benchmark_package.py``
+    """
+    pkgdir = tmpdir.mkdir('benchpkg')
+    pkgdir.join('__init__.py').write(
+        "import zetup\n"
+        "zetup.package(__name__, ['func'])\n"
+        "def func():\n"
+        "    pass\n")
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    benchpkg = __import__('benchpkg')
+    plain = benchpkg.__module__
+
+    resolved = []
+    resolve = zetup.package._resolve
+
+    def counting_resolve(self, name):
+        resolved.append(name)
+        return resolve(self, name)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(zetup.package, '_resolve', counting_resolve)
+        assert benchpkg.func is plain.func
+        assert benchpkg.func is plain.func
+        assert resolved == ['func']
+        assert benchpkg.__cache__['func'][0] is plain.func
+        # cache entries of replaced members are not used
+        plain.func = func = lambda: None
+        assert benchpkg.func is func
+        assert resolved == ['func', 'func']
+        benchpkg.__refresh__()
+        assert not benchpkg.__cache__
+        assert benchpkg.func is func
+        assert resolved == ['func', 'func', 'func']
+    del sys.modules['benchpkg']
+
+
+def empty_module(name):
+    """Create an empty module object `name` in ``sys.modules``.
+    """
+    mod = sys.modules[name] = ModuleType(name)
+    mod.__file__ = '%s.py' % name
+    return mod
+
+
+def test_package_features():
+    """Test the special features of :class:`zetup.package` wrappers.
+    """
+    empty_module('featurepkg')
+    featurepkg = zetup.package(
+        'featurepkg', __getitem__=lambda key: key * 2,
+        __iter__=lambda: iter([1, 2]), __call__=lambda *args: args)
+    assert featurepkg['a'] == 'aa'
+    assert list(featurepkg) == [1, 2]
+    assert featurepkg(1, 2) == (1, 2)
+
+    empty_module('featurepkg')
+    featurepkg = zetup.package('featurepkg')
+    for func in [lambda: featurepkg['a'], lambda: iter(featurepkg),
+                 featurepkg]:
+        with pytest.raises(TypeError):
+            func()
+    del sys.modules['featurepkg']
+
+
+def test_package_collected():
+    """Test that discarded :class:`zetup.package` wrappers are collected.
+    """
+    refs = []
+    for index in range(100):
+        name = 'discardedpkg%d' % index
+        empty_module(name)
+        refs.append(weakref.ref(zetup.package(
+            name, __getitem__=dict().get, __iter__=list().__iter__,
+            __call__=lambda: None)))
+        del sys.modules[name]
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="needs PEP 562")
+def test_native_package(tmpdir, monkeypatch):
+    """Test :class:`zetup.package` in `native` mode.
+    """
+    pkgdir = tmpdir.mkdir('nativepkg')
+    pkgdir.join('__init__.py').write(
+        "import zetup\n"
+        "zetup.package(__name__, {\n"
+        "    None: ['VALUE'],\n"
+        "    'sub': ['Member'],\n"
+        "}, aliases={'ALIAS': 'Member'}, deprecated_aliases={'OLD': 'VALUE'},\n"
+        "   native=True)\n"
+        "VALUE = 42\n")
+    pkgdir.join('sub.py').write("class Member(object):\n    pass\n")
+    pkgdir.join('other.py').write("")
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    nativepkg = __import__('nativepkg')
+    assert type(nativepkg) is ModuleType
+    assert sorted(nativepkg.__all__) == ['ALIAS', 'Member', 'VALUE']
+    assert {'ALIAS', 'Member', 'VALUE'} <= set(dir(nativepkg))
+    assert 'OLD' not in dir(nativepkg)
+    assert 'nativepkg.sub' not in sys.modules
+
+    assert nativepkg.ALIAS is sys.modules['nativepkg.sub'].Member
+    assert 'Member' in vars(nativepkg)
+    with pytest.warns(DeprecationWarning):
+        assert nativepkg.OLD == 42
+    assert nativepkg.other is sys.modules['nativepkg.other']
+    with pytest.raises(AttributeError):
+        nativepkg.missing
+
+    # the wrapper is still needed for special features
+    callpkg = zetup.package('nativepkg', __call__=lambda: 42, native=True)
+    assert isinstance(callpkg, zetup.package)
+    assert callpkg() == 42
+    for name in ['nativepkg', 'nativepkg.sub', 'nativepkg.other']:
+        del sys.modules[name]
@@ -0,0 +1,102 @@
+"""Test :mod:`zetup.package` package definitions and their scan cache.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+import os
+from glob import glob
+from importlib import import_module
+
+import pytest
+
+from zetup.package import Packages
+
+# zetup.package is shadowed by the package module wrapper class
+package_module = import_module('zetup.package')
+
+
+@pytest.fixture
+def tree(tmpdir):
+    """A package tree with sub-packages and data files.
+    """
+    pkgdir = tmpdir.mkdir('pkg')
+    for name in ['__init__.py', 'module.py', 'README']:
+        pkgdir.join(name).write("")
+    datadir = pkgdir.mkdir('data')
+    for name in ['one.txt', 'two.txt', '.hidden.txt', 'three.json']:
+        datadir.join(name).write("")
+    subdir = pkgdir.mkdir('sub')
+    subdir.join('__init__.py').write("")
+    subdir.mkdir('subsub').join('__init__.py').write("")
+    # not a package
+    pkgdir.mkdir('other').join('module.py').write("")
+    return tmpdir
+
+
+def test_packages(tree):
+    packages = Packages("pkg + data/*.txt README", root=str(tree))
+    assert list(packages) == ['pkg', 'pkg.sub', 'pkg.sub.subsub']
+    pkg = packages['pkg']
+    assert pkg.path == os.path.realpath(str(tree.join('pkg')))
+    assert list(pkg.sources()) == ['__init__.py', 'module.py']
+    assert sorted(pkg.datafiles()) == sorted(
+        os.path.relpath(path, pkg.path)
+        for pattern in pkg.data
+        for path in glob(os.path.join(pkg.path, pattern)))
+    assert packages.check() is None
+
+
+def test_scan_cache(tree, monkeypatch):
+    scanned = []
+
+    def scandir(path):
+        scanned.append(path)
+        return scandir.orig(path)
+
+    scandir.orig = package_module.scandir or os.listdir
+    if package_module.scandir is not None:
+        monkeypatch.setattr(package_module, 'scandir', scandir)
+    else:
+        monkeypatch.setattr(package_module.os, 'listdir', scandir)
+
+    packages = Packages("pkg + data/*.txt", root=str(tree))
+    assert all(pkg.scan is packages.scan for pkg in packages)
+    for _ in range(2):
+        for pkg in packages:
+            list(pkg.files())
+        packages.check()
+    # every directory is only scanned once
+    assert sorted(scanned) == sorted(set(scanned))
+    assert list(packages.scan.globs) == [
+        (packages['pkg'].path, os.path.join('data', '*.txt'))]
+
+    packages.scan.clear()
+    list(packages['pkg'].sources())
+    assert scanned.count(packages['pkg'].path) == 2
+
+
+@pytest.mark.parametrize('pattern', [
+    'data/*.txt', 'data/.*', 'data/*', 'data/', '*', 'd*/*.json', 'missing'])
+def test_datafiles_glob(tree, pattern):
+    pkg = Packages("pkg + %s" % pattern, root=str(tree))['pkg']
+    pattern = os.path.sep.join(pattern.split('/'))
+    assert list(pkg.datafiles()) == [
+        os.path.relpath(path, pkg.path)
+        for path in glob(os.path.join(pkg.path, pattern))]
+
+
+def test_subpackages_defined(tree):
+    packages = Packages("pkg\npkg.sub", root=str(tree))
+    pkg = packages['pkg']
+    # defined sub-packages are used even when searching is forced
+    assert list(pkg.subpackages(force_search=True)) == ['pkg.sub']
+    assert pkg.check()
+
+
+def test_scan_cache_clear(tree):
+    pkg = Packages("pkg + data/*.txt", root=str(tree))['pkg']
+    assert 'new.py' not in list(pkg.sources())
+    tree.join('pkg', 'new.py').write("")
+    tree.join('pkg', 'data', 'new.txt').write("")
+    pkg.scan.clear()
+    assert 'new.py' in list(pkg.sources())
+    assert os.path.join('data', 'new.txt') in list(pkg.datafiles())
@@ -0,0 +1,223 @@
+"""Test :class:`zetup.requires.Requirements`.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+import sys
+import json
+
+from path import Path
+
+from zetup.requires import (
+    CHECK_CACHE, DistributionNotFound, Requirement, Requirements,
+    RequirementsNotSatisfied, VersionConflict)
+from zetup.installed import distribution_index
+
+import pytest
+
+
+@pytest.fixture
+def site(tmpdir, monkeypatch):
+    """A ``sys.path`` entry with a ``fake-1.0`` distribution,
+       whose module must never be imported.
+    """
+    path = Path(str(tmpdir.mkdir('site')))
+    (path / 'fake-1.0.dist-info').mkdir()
+    (path / 'fake.py').write_text("raise RuntimeError('imported')\n")
+    monkeypatch.syspath_prepend(str(path))
+    distribution_index(refresh=True)
+    yield path
+    # don't leak the fake distribution into other tests
+    monkeypatch.undo()
+    distribution_index(refresh=True)
+
+
+def test_check_metadata(cache_dir, site):
+    reqs = Requirements("fake >= 1.0\nfake < 2 ; python_version < '0'\n")
+    assert reqs.check(mode='metadata')
+
+
+def test_check_metadata_failures(cache_dir, site):
+    reqs = Requirements("fake >= 2.0\nzetup-not-existing\n")
+    assert not reqs.check(mode='metadata', raise_=False)
+    with pytest.raises(RequirementsNotSatisfied) as exc:
+        reqs.check(mode='metadata')
+    # all failures are reported at once
+    assert len(exc.value.failures) == 2
+    assert "fake>=2.0" in str(exc.value)
+    assert "zetup-not-existing" in str(exc.value)
+
+
+def test_check_metadata_missing_dotted(cache_dir, site):
+    reqs = Requirements("zetup_not_existing.sub\n")
+    with pytest.raises(RequirementsNotSatisfied) as exc:
+        reqs.check(mode='metadata')
+    assert len(exc.value.failures) == 1
+    assert isinstance(exc.value.failures[0], DistributionNotFound)
+    assert 'zetup_not_existing' not in sys.modules
+
+
+def test_check_cache(cache_dir, site, monkeypatch):
+    reqs = Requirements("fake >= 1.0\n")
+    assert reqs.check(mode='metadata')
+
+    def check_metadata(raise_=True):
+        raise AssertionError("check result was not cached")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(reqs, 'check_metadata', check_metadata)
+        assert reqs.check(mode='metadata')
+        patch.setenv('ZETUP_NO_CHECK_CACHE', '1')
+        with pytest.raises(AssertionError):
+            reqs.check(mode='metadata')
+
+    # uninstalling invalidates the cached result
+    (site / 'fake-1.0.dist-info').rmdir()
+    (site / 'fake-0.9.dist-info').mkdir()
+    distribution_index(refresh=True)
+    assert not reqs.check(mode='metadata', raise_=False)
+
+
+def test_check_cache_key(cache_dir, site, monkeypatch):
+    reqs = Requirements("fake >= 1.0\n")
+    assert reqs.check(mode='metadata')
+    entries = (cache_dir / 'check').files('*.json')
+    assert len(entries) == 1
+    # sys.path is only part of the key as hash
+    assert str(site) not in json.loads(entries[0].read_text())['key']
+
+    # a changed sys.path directory leads to a new entry
+    (site / 'other.py').write_text("")
+    assert reqs.check(mode='metadata')
+    assert len((cache_dir / 'check').files('*.json')) == 2
+
+
+def test_check_cache_pruning(cache_dir, site, monkeypatch):
+    monkeypatch.setattr(CHECK_CACHE, 'max_entries', 3)
+    for minor in range(5):
+        assert Requirements("fake >= 0.%d\n" % minor).check(mode='metadata')
+    assert len((cache_dir / 'check').files('*.json')) == 3
+
+
+def test_merge():
+    reqs = Requirements("""
+    foo >= 1.0
+    bar #import baz
+    """)
+    assert list(reqs['FOO'].specs) == [('>=', '1.0')]
+    assert 'Bar' in reqs
+
+    merged = reqs + Requirements("""
+    foo < 3.0
+    bar[extra]
+    """)
+    assert len(merged) == 2
+    assert sorted(merged['foo'].specs) == [('<', '3.0'), ('>=', '1.0')]
+    assert merged['bar'].extras == ('extra', )
+    assert merged['bar'].impname == 'baz'
+    # the operands stay unchanged
+    assert len(reqs['foo'].specs) == 1
+
+    del merged['Foo']
+    assert 'foo' not in merged
+    with pytest.raises(KeyError):
+        del merged['foo']
+
+
+def test_merge_markers():
+    reqs = Requirements("""
+    foo >= 1.0
+    foo >= 2.0; python_version < "3"
+    """)
+    # the unconditional requirement must stay unconditional
+    assert len(reqs) == 2
+    assert [req.marker for req in reqs][0] is None
+    assert list(reqs['foo'].specs) == [('>=', '1.0')]
+    assert str(reqs).splitlines() == [
+        'foo>=1.0', 'foo>=2.0; python_version < "3"']
+
+    merged = reqs + 'foo < 3.0; python_version < "3"\nfoo != 1.5'
+    assert len(merged) == 2
+    unconditional, conditional = merged
+    assert sorted(unconditional.specs) == [('!=', '1.5'), ('>=', '1.0')]
+    assert sorted(conditional.specs) == [('<', '3.0'), ('>=', '2.0')]
+    assert str(conditional.marker) == 'python_version < "3"'
+
+    del merged['foo']
+    assert not len(merged)
+
+
+def test_add_without_reparsing(monkeypatch):
+    reqs = Requirements("foo >= 1.0")
+    extra = Requirements("bar")
+
+    def _parse(text):
+        raise AssertionError("requirements were parsed again")
+
+    monkeypatch.setattr(Requirements, '_parse', staticmethod(_parse))
+    combined = reqs + extra
+    assert [req.key for req in combined] == ['foo', 'bar']
+    reqs += extra
+    assert reqs == combined
+
+
+def test_tokenize():
+    assert list(Requirements._tokenize("""
+    # comment
+    foo >= 1.0 #import bar
+    #py3 baz; python_version > "3" # comment
+    qux[a,\\
+        b] >= 2.0 \\
+        #import quux
+    """)) == [
+        (None, 'foo >= 1.0', 'bar'),
+        ('3', 'baz; python_version > "3"', None),
+        (None, 'qux[a,b] >= 2.0', 'quux'),
+    ]
+
+
+@pytest.mark.parametrize('text, equivalent', [
+    ("foo >= 1.0 \\\n    , < 2.0", "foo >= 1.0, < 2.0"),
+    ("qux[a,\\\n    b] >= 2.0 \\\n    #import quux",
+     "qux[a,b] >= 2.0 #import quux"),
+    ("bar \\\n  # comment\nbaz", "bar\nbaz"),
+    ("#py%d foo \\\n  >= 1.0 #import bar" % sys.version_info[0],
+     "foo >= 1.0 #import bar"),
+    ("#py2%d foo \\\n  >= 1.0\nbar" % sys.version_info[0], "bar"),
+])
+def test_parse_continuation_lines(text, equivalent):
+    """Continued requirement lines are parsed
+       like their single-line equivalents.
+    """
+    assert [(str(req), req.impname) for req in Requirements._parse(text)] \
+        == [(str(req), req.impname)
+            for req in Requirements._parse(equivalent)]
+
+
+def test_parse():
+    text = '\n'.join(
+        "%spackage%d == 1.%d%s" % (
+            '#py%d ' % sys.version_info[0] if i % 3 else '',
+            i, i, ' #import module%d' % i if i % 2 else '')
+        for i in range(6)) + "\n#py2%d skipped\n\n# comment\n" % (
+            sys.version_info[0])
+
+    assert [(str(req), req.impname) for req in Requirements._parse(text)] \
+        == [('package%d==1.%d' % (i, i),
+             'module%d' % i if i % 2 else 'package%d' % i)
+            for i in range(6)]
+
+
+def test_pkg_resources_compatible_errors():
+    import pkg_resources
+
+    req = Requirement('foo>=1.0')
+    with pytest.raises(pkg_resources.VersionConflict) as exc:
+        raise VersionConflict(req, '0.9', 'bar-1.0')
+    assert isinstance(exc.value, VersionConflict)
+    assert exc.value.dist == 'foo-0.9' and exc.value.req is req
+    assert str(exc.value) == "bar-1.0 needs foo>=1.0 but found foo-0.9"
+
+    with pytest.raises(pkg_resources.DistributionNotFound) as exc:
+        raise DistributionNotFound(req, 'bar-1.0')
+    assert isinstance(exc.value, DistributionNotFound)
+    assert exc.value.requirers == ['bar-1.0']
@@ -0,0 +1,203 @@
+"""Test :func:`zetup.resolve`.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+import sys
+import json
+import threading
+from importlib import import_module
+
+from pkg_resources import (
+    Requirement, DistributionNotFound, find_distributions)
+
+from zetup.eggcache import EggCache
+# zetup.resolve is shadowed by the function of the same name
+resolver = import_module('zetup.resolve')
+
+import pytest
+
+
+class FakeDistribution(object):
+    """Stand-in for :class:`pkg_resources.Distribution`.
+    """
+    def __init__(self, name, requires=(), location=None):
+        self.name = name
+        self._requires = [Requirement.parse(req) for req in requires]
+        self.location = location or '/site'
+        self.version = '1.0'
+
+    def requires(self, extras=()):
+        return self._requires
+
+    def __repr__(self):
+        return "<%s>" % self.name
+
+
+@pytest.fixture
+def index(monkeypatch, tmpdir):
+    """Fake installed and fetchable distributions
+       with lists of requested and fetched distribution names.
+    """
+    class Index(dict):
+        requested = []
+        fetched = []
+        threads = set()
+
+    index = Index()
+    installed = set()
+
+    def get_distribution(req):
+        index.requested.append(req.key)
+        if req.key not in installed:
+            raise DistributionNotFound(req, None)
+        return index[req.key]
+
+    def fetch(req):
+        index.threads.add(threading.current_thread())
+        index.fetched.append(req.key)
+        return index[req.key]
+
+    def install(name, *requires, **kwargs):
+        fetchable = kwargs.get('fetchable', False)
+        index[name] = FakeDistribution(name, requires, location=str(
+            tmpdir / name) if fetchable else None)
+        if not fetchable:
+            installed.add(name)
+
+    index.install = install
+    monkeypatch.setattr(resolver, 'get_distribution', get_distribution)
+    monkeypatch.setattr(resolver, 'INSTALLER', fetch)
+    monkeypatch.setattr(resolver.working_set, 'add_entry', lambda _: None)
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+    return index
+
+
+def test_resolve(index):
+    # a diamond with a cycle
+    index.install('top', 'left', 'right')
+    index.install('left', 'bottom')
+    index.install('right', 'bottom', 'top')
+    index.install('bottom', 'top')
+    resolver.resolve(['top'])
+    assert index.requested == ['top', 'left', 'right', 'bottom']
+    assert not index.fetched
+
+
+def test_resolve_fetch(index, monkeypatch):
+    monkeypatch.setenv('ZETUP_RESOLVE_WORKERS', '3')
+    index.install('top', 'one', 'two', 'three')
+    for name in ['one', 'two', 'three']:
+        index.install(name, fetchable=True)
+    resolver.resolve(['top'])
+    assert sorted(index.fetched) == ['one', 'three', 'two']
+    assert threading.current_thread() not in index.threads
+    # fetched eggs are in front of sys.path in requirement order
+    assert [path.split('/')[-1] for path in sys.path[:3]] \
+        == ['one', 'two', 'three']
+
+
+def test_resolve_egg_cache(tmpdir, monkeypatch):
+    """Fetch an egg from a local directory index once
+       and reuse it from the egg cache afterwards.
+    """
+    egg = 'fakeegg-1.0-py%d.%d.egg' % sys.version_info[:2]
+    index = tmpdir.mkdir('index')
+    index.mkdir(egg).mkdir('EGG-INFO').join('PKG-INFO').write(
+        "Metadata-Version: 1.1\nName: fakeegg\nVersion: 1.0\n")
+    index.join(egg).join('fakeegg.py').write("")
+
+    fetched = []
+
+    def fetch(req):
+        fetched.append(str(req))
+        eggs = tmpdir.ensure('project', '.eggs', dir=True)
+        index.join(egg).copy(eggs.join(egg))
+        dist, = find_distributions(str(eggs.join(egg)), only=True)
+        return dist
+
+    monkeypatch.setattr(resolver, 'INSTALLER', fetch)
+    monkeypatch.setattr(resolver.working_set, 'add_entry', lambda _: None)
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+    cache = str(tmpdir / 'cache')
+
+    resolver.resolve(['fakeegg>=1.0'], egg_cache=cache)
+    assert fetched == ['fakeegg>=1.0']
+    assert sys.path[0] == str(tmpdir / 'project' / '.eggs' / egg)
+
+    monkeypatch.setattr(sys, 'path', list(sys.path[1:]))
+    monkeypatch.setenv('ZETUP_EGG_CACHE', cache)
+    resolver.resolve(['fakeegg'])
+    assert fetched == ['fakeegg>=1.0']
+    assert sys.path[0].startswith(cache)
+    assert sys.path[0].endswith(egg)
+
+    assert EggCache(cache).find(Requirement.parse('fakeegg>1.0')) is None
+
+
+def test_resolve_plan(index):
+    index.install('top', 'one', 'two')
+    index.install('one', 'top')
+    index.install('two', fetchable=True)
+    path = list(sys.path)
+
+    plan = resolver.resolve(['top'], plan=True)
+    assert list(plan) == ['top', 'one', 'two']
+    assert [node['status'] for node in plan.values()] \
+        == ['installed', 'installed', 'fetch']
+    assert plan['top']['requires'] == ['one', 'two']
+    assert plan['two']['version'] is None
+    assert plan.cycles == ['top->one->top']
+    assert not index.fetched
+    assert sys.path == path
+
+    report = json.loads(plan.json)
+    assert report['dry_run'] is True
+    assert [node['name'] for node in report['nodes']] \
+        == ['top', 'one', 'two']
+
+    plan = resolver.resolve(['top'])
+    assert plan['two']['status'] == 'fetched'
+    assert plan['two']['version'] == '1.0'
+    assert plan['two']['time']['fetch'] >= 0
+    assert index.fetched == ['two']
+
+
+def test_resolve_conflicts(index):
+    index.install('top', 'one', 'two')
+    index.install('one', 'bottom>=1.0')
+    index.install('two', 'bottom<1.0')
+    index.install('bottom')
+
+    plan = resolver.resolve(['top'])
+    assert list(plan) == ['top', 'one', 'two', 'bottom']
+    assert plan['bottom']['requirement'] == 'bottom>=1.0'
+    assert plan.conflicts == ['bottom<1.0->two->top']
+    assert json.loads(plan.json)['conflicts'] == plan.conflicts
+
+
+def test_fetch_build_egg_per_thread(monkeypatch):
+    distributions = []
+
+    class FakeSetuptoolsDistribution(object):
+        def __init__(self):
+            distributions.append(self)
+
+        def fetch_build_egg(self, req):
+            return self
+
+    monkeypatch.setattr(resolver, 'Distribution', FakeSetuptoolsDistribution)
+    monkeypatch.setattr(resolver, '_LOCAL', threading.local())
+    monkeypatch.setenv('ZETUP_RESOLVE_WORKERS', '2')
+    barrier = threading.Barrier(2, timeout=5)
+
+    def install(req):
+        # make sure that both workers are busy at the same time
+        dist = resolver.fetch_build_egg(req)
+        barrier.wait()
+        return dist
+
+    monkeypatch.setattr(resolver, 'INSTALLER', install)
+    results = resolver._fetch(['one', 'two'])
+    assert len(distributions) == 2
+    assert set(dist for dist, _ in results) == set(distributions)
+    assert resolver.fetch_build_egg('three') is resolver.fetch_build_egg('four')
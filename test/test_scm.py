@@ -0,0 +1,112 @@
+"""Test :mod:`zetup.scm`, resolving project versions from git repositories.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+import sys
+from subprocess import check_output
+
+from zetup import scm
+
+import pytest
+
+
+def git(repo, *args):
+    return check_output([
+        'git', '-C', str(repo),
+        '-c', 'user.name=zetup', '-c', 'user.email=zetup@example.com',
+    ] + list(args)).decode().strip()
+
+
+@pytest.fixture
+def repo(project):
+    """The minimal zetup project as git repository with a 1.0 tag.
+    """
+    (project / 'VERSION').remove()
+    git(project, 'init', '-q')
+    git(project, 'add', '.')
+    git(project, 'commit', '-q', '-m', 'initial')
+    git(project, 'tag', '1.0')
+    return project
+
+
+def test_head(repo):
+    assert scm.head(repo) == git(repo, 'rev-parse', 'HEAD')
+    # also works from sub-directories
+    assert scm.head(repo / 'project') == git(repo, 'rev-parse', 'HEAD')
+
+    git(repo, 'pack-refs', '--all')
+    assert scm.head(repo) == git(repo, 'rev-parse', 'HEAD')
+
+    git(repo, 'checkout', '-q', '--detach')
+    assert scm.head(repo) == git(repo, 'rev-parse', 'HEAD')
+
+
+def test_head_no_repo():
+    assert scm.find_git_dir('/') is None
+    assert scm.inputs('/') is None
+
+
+def test_get_version(cache_dir, repo, monkeypatch):
+    pytest.importorskip('setuptools_scm')
+    assert scm.get_version(repo) == '1.0'
+    # a cached version must not need setuptools_scm
+    with monkeypatch.context() as patch:
+        patch.setitem(sys.modules, 'setuptools_scm', None)
+        assert scm.get_version(repo) == '1.0'
+
+    # modifications of tracked files invalidate the cached version
+    (repo / 'zetuprc').write_text("[project]\n\ndescription = Dirty\n")
+    assert scm.get_version(repo) == '1.1.dev0'
+    git(repo, 'checkout', '-q', 'zetuprc')
+    assert scm.get_version(repo) == '1.0'
+
+    (repo / 'README').write_text("")
+    git(repo, 'add', 'README')
+    git(repo, 'commit', '-q', '-m', 'README')
+    assert scm.get_version(repo) == '1.1.dev1'
+
+
+def test_index(repo):
+    entries = scm.index(str(repo / '.git'))
+    assert sorted(entry[0] for entry in entries) \
+        == git(repo, 'ls-files').split('\n')
+    git(repo, 'update-index', '--index-version', '4')
+    assert scm.index(str(repo / '.git')) == entries
+
+
+@pytest.mark.parametrize('tag', [
+    ['1.0'], ['v1.0'], ['-a', '-m', 'release', '1.0']])
+def test_tag_version(cache_dir, project, monkeypatch, tag):
+    """Versions of clean trees with release tags need no setuptools_scm.
+    """
+    (project / 'VERSION').remove()
+    git(project, 'init', '-q')
+    git(project, 'add', '.')
+    git(project, 'commit', '-q', '-m', 'initial')
+    git(project, 'tag', *tag)
+    monkeypatch.setitem(sys.modules, 'setuptools_scm', None)
+    assert scm.tag_version(project) == '1.0'
+    assert scm.get_version(project) == '1.0'
+    git(project, 'pack-refs', '--all')
+    assert scm.tag_version(project) == '1.0'
+
+    (project / 'zetuprc').write_text("[project]\n\ndescription = Dirty\n")
+    assert scm.tag_version(project) is None
+    with pytest.raises(ImportError):
+        scm.get_version(project)
+
+
+def test_tag_version_other(repo):
+    git(repo, 'tag', '1.0rc1')
+    # ambiguous tags and versions needing normalization
+    # are left to setuptools_scm
+    assert scm.tag_version(repo) is None
+    git(repo, 'tag', '-d', '1.0')
+    assert scm.tag_version(repo) is None
+
+    git(repo, 'tag', '1.0')
+    git(repo, 'tag', '-d', '1.0rc1')
+    (repo / 'README').write_text("")
+    git(repo, 'add', 'README')
+    git(repo, 'commit', '-q', '-m', 'README')
+    assert scm.tag_version(repo) is None
@@ -0,0 +1,46 @@
+"""Test :class:`zetup.version.Version`.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+import zetup.version
+from zetup.version import Version
+
+
+def test_compare():
+    assert Version('1.0') == '1.0.0'
+    assert Version('1.0') < Version('1.1') <= '1.1'
+    assert Version('1.10') > '1.9'
+
+
+def test_hash():
+    # consistent with comparisons of equivalent versions
+    assert Version('1.0') == Version('1.0.0')
+    assert hash(Version('1.0')) == hash(Version('1.0.0'))
+    assert len({Version('1.0'), Version('1.0.0')}) == 1
+    assert {Version('1.0'): 'one'}[Version('1.0.0')] == 'one'
+
+
+def test_sort():
+    versions = ['1.10', Version('1.2'), '1.0.dev1', Version('1.9'), '2.0a1']
+    assert Version.sort(versions) \
+        == ['1.0.dev1', '1.2', '1.9', '1.10', '2.0a1']
+    assert Version.sort(versions, reverse=True)[0] == '2.0a1'
+    assert Version.max(versions) == '2.0a1'
+
+
+def test_parsed_once(monkeypatch):
+    parsed = []
+
+    def parse_version(version):
+        parsed.append(version)
+        return parse_version.orig(version)
+
+    parse_version.orig = zetup.version.parse_version
+    monkeypatch.setattr(zetup.version, 'parse_version', parse_version)
+
+    versions = [Version('%d.%d' % (i % 7, i)) for i in range(100)]
+    for _ in range(3):
+        sorted(versions)
+        Version.sort(versions, reverse=True)
+        Version.max(versions)
+    assert sorted(parsed) == sorted(versions)
@@ -0,0 +1,108 @@
+"""Test :class:`zetup.Zetup` config objects and their process-wide registry.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+from types import ModuleType
+
+from zetup import Zetup
+from zetup.config import load_zetup_config_snapshot
+
+import pytest
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """An empty temporary :attr:`zetup.Zetup.registry`.
+    """
+    monkeypatch.setattr(Zetup, 'registry', {})
+    return Zetup.registry
+
+
+def test_load(cache_dir, project, registry):
+    zfg = Zetup.load(project)
+    assert list(registry.values()) == [zfg]
+    # also registered under the real path of relative or symlinked dirs
+    assert Zetup.load(project / '..' / 'project') is zfg
+
+
+def test_load_stale(cache_dir, project, registry):
+    zfg = Zetup.load(project)
+    assert not zfg.stale
+    (project / 'VERSION').write_text("2.0\n")
+    assert zfg.stale
+    # stale configs are reloaded in place
+    assert Zetup.load(project) is zfg
+    assert not zfg.stale
+    assert zfg.VERSION == '2.0'
+
+
+def test_reload(cache_dir, project, registry):
+    zfg = Zetup.load(project)
+    zfg.CUSTOM = True
+    zfg.reload()
+    assert 'CUSTOM' not in zfg.config
+    assert zfg.NAME == 'project'
+
+    registry.clear()
+    assert Zetup.load(project) is not zfg
+
+
+def test_config_snapshot(cache_dir, project):
+    zfg = Zetup(project)
+    path = project / 'project' / 'zetup_config.json'
+    path.write_text(zfg.config_json)
+
+    module = ModuleType('project.zetup_config')
+    load_zetup_config_snapshot(path, module)
+    for name in ['NAME', 'DESCRIPTION', 'CLASSIFIERS', 'VERSION']:
+        assert getattr(module, name) == getattr(zfg, name)
+    assert module.REQUIRES == zfg.REQUIRES
+    assert module.REQUIRES['path.py'].impname == 'path'
+    assert module.EXTRAS['extra'] == zfg.EXTRAS['extra']
+    assert list(module.PACKAGES) == list(zfg.PACKAGES)
+    assert module.PACKAGES.root == project.realpath()
+
+
+def test_config_snapshot_lazy(cache_dir, project, monkeypatch):
+    zfg = Zetup(project)
+    path = project / 'project' / 'zetup_config.json'
+    path.write_text(zfg.config_json)
+
+    module = ModuleType('project.zetup_config')
+    load_zetup_config_snapshot(path, module)
+    requires = module.REQUIRES
+    extras = module.EXTRAS
+
+    def parse(spec):
+        raise AssertionError("requirement %s was parsed" % spec)
+
+    # containment checks and text don't need parsed requirements
+    with monkeypatch.context() as patch:
+        patch.setattr('zetup.requires.Requirement', parse)
+        assert 'path.py' in requires
+        assert 'zetup' in extras['extra']
+        assert 'other' not in requires
+        assert str(requires.txt) == "path.py >= 10.3 #import path"
+
+    assert requires['path.py'].impname == 'path'
+    assert list(requires) == list(zfg.REQUIRES)
+    assert extras['all'] == zfg.EXTRAS['all']
+
+
+def test_setup_keywords_snapshot(cache_dir, project):
+    zfg = Zetup(project)
+    assert not zfg.loads_config_snapshot
+    assert 'project' not in zfg.setup_keywords()['package_data']
+
+    # a module made with ``zetup make zetup_config_snapshot``
+    # loads the snapshot regardless of the ``zetup config snapshot`` option
+    (project / 'project' / 'zetup_config.py').write_text(
+        "from zetup.config import load_zetup_config_snapshot\n")
+    assert not zfg.ZETUP_CONFIG_SNAPSHOT
+    assert zfg.loads_config_snapshot
+    assert zfg.setup_keywords()['package_data']['project'] \
+        == ['zetup_config.json']
+
+    (project / 'project' / 'zetup_config.py').write_text("")
+    zfg.ZETUP_CONFIG_SNAPSHOT = True
+    assert not zfg.loads_config_snapshot
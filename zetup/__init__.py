@@ -25,45 +25,61 @@ from __future__ import absolute_import
 
 import sys
 
-import pkg_resources
+
+def _fresh_working_set(name):
+    """
+    Create replacement for function `name` of ``pkg_resources``, which
+    delegates to a fresh ``pkg_resources.WorkingSet`` created on first call
+    """
+    working_set = []
+
+    def func(*args, **kwargs):
+        if not working_set:
+            working_set.append(pkg_resources.WorkingSet())
+        return getattr(working_set[0], name)(*args, **kwargs)
+
+    func.__name__ = name
+    func.__doc__ = getattr(pkg_resources, name).__doc__
+    return func
+
+
 # pkg_resources might not be fully populated yet during setup of namespaces
-pkg_resources.iter_entry_points = pkg_resources.WorkingSet().iter_entry_points
-pkg_resources.require = pkg_resources.WorkingSet().require
-
-
-from .zetup import Zetup, find_zetup_config
-from .error import ZetupError
-from .config import ZetupConfigNotFound
-from .requires import DistributionNotFound, VersionConflict
-from .resolve import resolve
-from .process import Popen, call
-from .object import object, meta
-from .annotate import annotate
+# (but zetup doesn't import the slow pkg_resources itself)
+pkg_resources = sys.modules.get('pkg_resources')
+if pkg_resources is not None:
+    pkg_resources.iter_entry_points = _fresh_working_set('iter_entry_points')
+    pkg_resources.require = _fresh_working_set('require')
+
+
 from .modules import package, toplevel, extra_toplevel
-from .classpackage import classpackage
-# import notebook subpackage for defining extra_toplevel below
-from . import notebook
-
-
-zetup = toplevel(__name__, [
-    'Zetup', 'find_zetup_config',
-    'ZetupError', 'ZetupConfigNotFound',
-    'resolve', 'DistributionNotFound', 'VersionConflict',
-    'Popen', 'call',
-    'object', 'meta',
-    'annotate', 'package', 'toplevel', 'extra_toplevel',
-], check_requirements=False)
-
-# can't be defined in .notebook subpackage
-# because .notebook is also needed to load zetup's own config
-# which is required for making extra_toplevel instantiation work
-extra_toplevel(zetup, notebook.__name__, [
-    'Notebook',
-], check_requirements=False)
-# since actual .notebook subpackage was imported before
-# a manually setting of the subpackage attribute
-# on the zetup toplevel wrapper is needed
-sys.modules[__name__].notebook = sys.modules[notebook.__name__]
+
+
+# all other API members are imported from their sub-modules on first access,
+# and zetup's own config is loaded on first access of zetup.__version__ etc.
+zetup = toplevel(__name__, {
+    None: [
+        'resolve', 'package', 'toplevel', 'extra_toplevel',
+    ],
+    'zetup': ['Zetup', 'find_zetup_config'],
+    'error': ['ZetupError'],
+    'config': ['ZetupConfigNotFound'],
+    'requires': ['DistributionNotFound', 'VersionConflict'],
+    'process': ['Popen', 'call'],
+    'object': ['object', 'meta'],
+    'annotate': ['annotate'],
+    'classpackage': ['classpackage'],
+}, check_requirements=False, lazy=True)
+
+
+def resolve(requirements, egg_cache=None, plan=False):
+    """
+    Resolve setup `requirements` with :func:`zetup.resolve.resolve`
+
+    Which is only imported on demand, since it needs setuptools
+    """
+    from .resolve import resolve
+
+    return resolve(requirements, egg_cache=egg_cache, plan=plan)
 
 
 def setup_entry_point(dist, keyword='use_zetup', value=True):
@@ -28,6 +28,15 @@ from .package import Packages
 __all__ = ['annotate', 'annotate_extra']
 
 
+def check_mode(check_requirements):
+    """Get the requirements check mode from a `check_requirements` option,
+       which is either a mode name or ``True`` for the default mode.
+    """
+    if isinstance(check_requirements, str):
+        return check_requirements
+    return None
+
+
 def annotate(pkgname, check_requirements=True, check_packages=True):
     """Find zetup config for given `pkgname`
        and add __version__, __requires__, __dist__, __description__,
@@ -35,6 +44,9 @@ def annotate(pkgname, check_requirements=True, check_packages=True):
 
     - Automatically checks installed package requirements
       unless `check_requirements` is False.
+      It can also be a :meth:`zetup.requires.Requirements.check` mode name,
+      like ``'metadata'`` for checking all requirements at once
+      without importing them.
     - Automatically checks installed package files
       unless `check_packages` is False.
     - Returns the zetup config object.
@@ -48,7 +60,7 @@ def annotate(pkgname, check_requirements=True, check_packages=True):
     mod.__version__ = zfg.VERSION
     mod.__requires__ = zfg.REQUIRES
     if check_requirements:
-        zfg.REQUIRES.check()
+        zfg.REQUIRES.check(mode=check_mode(check_requirements))
     if zfg.EXTRAS:
         mod.__extras__ = zfg.EXTRAS
     mod.__distribution__ = zfg.DISTRIBUTION.find(os.path.dirname(__file__))
@@ -79,7 +91,7 @@ class annotate_extra(object):
         mod.__requires__ \
             = toplevel.__requires__ + toplevel.__extras__[extra]
         if check_requirements:
-            mod.__requires__.check()
+            mod.__requires__.check(mode=check_mode(check_requirements))
 
 
 annotate_extra = annotate_extra()
@@ -0,0 +1,254 @@
+# ZETUP
+#
+# Zimmermann's Extensible Tools for Unified Project setups
+#
+# Copyright (C) 2014-2017 Stefan Zimmermann <user@zimmermann.co>
+#
+# ZETUP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ZETUP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with ZETUP. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Persistent on-disk caches, invalidated by stat signatures of their inputs
+
+The cache root directory is taken from ``ZETUP_CACHE_DIR`` or defaults to
+``zetup/`` under ``XDG_CACHE_HOME`` or ``~/.cache``. Setting ``ZETUP_NO_CACHE``
+to a non-empty value disables all persistent caches
+"""
+
+import sys
+import os
+import json
+from hashlib import sha1
+from tempfile import mkstemp
+
+__all__ = ['Cache', 'cache_dir', 'stat_signature', 'unchanged']
+
+if sys.version_info[0] == 3:
+    unicode = str
+
+
+def _native(obj):
+    """
+    Recursively convert ``unicode`` objects from ``json.load`` to ``str``
+
+    Only has an effect in PY2, where ``str`` methods like ``str.strip`` don't
+    accept ``unicode`` arguments
+    """
+    if sys.version_info[0] == 3:
+        return obj
+
+    if isinstance(obj, unicode):
+        return obj.encode('utf-8')
+    if isinstance(obj, list):
+        return [_native(item) for item in obj]
+    if isinstance(obj, dict):
+        return {_native(key): _native(value) for key, value in obj.items()}
+    return obj
+
+
+def cache_dir():
+    """
+    Get the root directory of all persistent zetup caches
+    """
+    path = os.environ.get('ZETUP_CACHE_DIR')
+    if path:
+        return path
+
+    base = os.environ.get('XDG_CACHE_HOME') \
+        or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'zetup')
+
+
+def stat_signature(path):
+    """
+    Get a JSON-serializable ``[mtime, size]`` signature of file `path`
+
+    Returns ``None`` if `path` doesn't exist, which is also a valid
+    signature, since later creation of a file can invalidate cached data
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return [stat.st_mtime, stat.st_size]
+
+
+def unchanged(signatures):
+    """
+    Check if all files from a list of ``[path, signature]`` pairs still have
+    the same :func:`stat_signature`
+    """
+    for path, signature in signatures:
+        if stat_signature(path) != signature:
+            return False
+
+    return True
+
+
+class Cache(object):
+    """
+    A named store of JSON data entries under :func:`cache_dir`
+
+    Every entry is stored together with the :func:`stat_signature` of each
+    input file it was derived from, and is only returned by :meth:`.load`
+    as long as none of those signatures changed
+    """
+
+    #: Format version of stored entries. Increase on incompatible changes
+    FORMAT = 1
+
+    def __init__(self, name, disable_env=None, max_entries=None):
+        """
+        Create cache with given `name`, used as sub-directory name
+
+        Optional `disable_env` names an additional environment variable
+        disabling just this cache. Optional `max_entries` limits the number
+        of stored entries, by dropping the least recently stored ones
+        """
+        self.name = name
+        self.disable_env = disable_env
+        self.max_entries = max_entries
+
+    @property
+    def enabled(self):
+        """
+        Check if neither ``ZETUP_NO_CACHE`` nor :attr:`.disable_env` is set
+        """
+        return not (os.environ.get('ZETUP_NO_CACHE') or self.disable_env
+                    and os.environ.get(self.disable_env))
+
+    @property
+    def path(self):
+        return os.path.join(cache_dir(), self.name)
+
+    def entry_path(self, key):
+        """
+        Get the path of the file storing the entry for `key`
+        """
+        return os.path.join(self.path, '%s.json' % sha1(
+            key.encode('utf-8')).hexdigest())
+
+    def load(self, key, with_inputs=False):
+        """
+        Get the data stored for `key` or ``None``
+
+        Also returns ``None`` if the stored entry is outdated, unreadable, or
+        if caching is disabled
+
+        If `with_inputs` is set, a tuple of the data and the stored
+        ``[path, signature]`` pairs of its inputs is returned instead
+        """
+        miss = (None, None) if with_inputs else None
+        if not self.enabled:
+            return miss
+
+        try:
+            with open(self.entry_path(key)) as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return miss
+
+        if entry.get('format') != self.FORMAT or entry.get('key') != key \
+                or entry.get('python') != sys.version_info[0]:
+            return miss
+
+        if not unchanged(entry['inputs']):
+            return miss
+
+        data = _native(entry['data'])
+        if with_inputs:
+            return data, _native(entry['inputs'])
+
+        return data
+
+    def store(self, key, data, inputs=()):
+        """
+        Store JSON-serializable `data` for `key`
+
+        Given `inputs` are the paths of all files the `data` was derived
+        from. Caching is only an optimization, so any errors writing the entry
+        are silently ignored
+
+        Returns the list of ``[path, signature]`` pairs of the `inputs`
+        """
+        signatures = [[path, stat_signature(path)] for path in inputs]
+        if not self.enabled:
+            return signatures
+
+        entry = {
+            'format': self.FORMAT,
+            'key': key,
+            'python': sys.version_info[0],
+            'inputs': signatures,
+            'data': data,
+        }
+        try:
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            # write to temporary file first and then move it into place,
+            # so that concurrent processes never read partial entries
+            fd, tmppath = mkstemp(dir=self.path, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            if sys.version_info[0] == 3:
+                os.replace(tmppath, self.entry_path(key))
+            else:
+                # PY2 has no atomic replacement on Windows
+                if os.path.exists(self.entry_path(key)):
+                    os.remove(self.entry_path(key))
+                os.rename(tmppath, self.entry_path(key))
+        except (IOError, OSError, TypeError, ValueError):
+            pass
+        if self.max_entries is not None:
+            self.prune(self.max_entries)
+        return signatures
+
+    def prune(self, max_entries):
+        """
+        Remove the least recently stored entries exceeding `max_entries`
+        """
+        try:
+            entries = [os.path.join(self.path, fname)
+                       for fname in os.listdir(self.path)
+                       if fname.endswith('.json')]
+        except OSError:
+            return
+
+        if len(entries) <= max_entries:
+            return
+
+        # entries removed concurrently have no signature
+        entries.sort(key=lambda path: stat_signature(path) or [0, 0])
+        for path in entries[:len(entries) - max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        Remove all stored entries of this cache
+        """
+        if not os.path.isdir(self.path):
+            return
+
+        for fname in os.listdir(self.path):
+            try:
+                os.remove(os.path.join(self.path, fname))
+            except OSError:
+                pass
+
+    def __repr__(self):
+        return "<%s %s at %s>" % (
+            type(self).__name__, repr(self.name), repr(self.path))
@@ -27,10 +27,53 @@ from __future__ import absolute_import
 
 __all__ = ['classpackage']
 
+import sys
+import os
 from importlib import import_module
+from threading import Thread
 
 from .modules import package
 
+#: The few special attributes taken from the classpackage instance itself
+#: instead of from the actual class object
+SPECIAL_ATTRIBUTES = frozenset([
+    '__name__', '__all__', '__module__', '__path__', '__file__', '__class__',
+    '__dict__',
+    # accessed by the import system when importing member modules
+    '__spec__', '__loader__', '__package__',
+    # for clearing the cache of delegated attributes
+    '__refresh__',
+])
+
+#: The supported ways of importing the ``membermodules`` of class packages
+IMPORT_MEMBERS = ('eager', 'background', 'lazy')
+
+
+class lazymember(object):
+    """Placeholder for a class member defined in a not yet imported
+    member module of a :class:`zetup.classpackage`.
+
+    Imports the member module on first access, which replaces this
+    placeholder with the actual member via :func:`zetup.object.member`
+    """
+
+    def __init__(self, owner, modname, name):
+        self.owner = owner
+        self.modname = modname
+        self.name = name
+
+    def __get__(self, obj, cls=None):
+        import_module(self.modname)
+        if self.owner.__dict__.get(self.name) is self:
+            raise AttributeError(
+                "member module %s doesn't define %s.%s" % (
+                    repr(self.modname), self.owner.__name__, self.name))
+        return getattr(self.owner if obj is None else obj, self.name)
+
+    def __repr__(self):
+        return "<%s %s from %s>" % (
+            type(self).__name__, repr(self.name), repr(self.modname))
+
 
 class classpackage(package):
     """Sub-package module wrapper, auto-importing a class definition
@@ -76,28 +119,125 @@ class classpackage(package):
     """
     __module__ = __package__
 
-    def __init__(self, pkgname, membermodules=None):
+    def __init__(self, pkgname, membermodules=None, import_members='eager',
+                 cache_members=False):
         """Created with ``__name__`` of the subpackage defining the class
         and the optional list of `membermodules` to automatically import
         (sub-modules defining additional class members).
+
+        `membermodules` can also be a dictionary mapping member module
+        names to lists of the member names they define.
+
+        `import_members` defines when the member modules are imported:
+
+        * ``'eager'`` -- All of them when the class is first accessed,
+          which already happens at import of this class package if the
+          parent package is a :class:`zetup.package`.
+        * ``'background'`` -- Like ``'eager'``, but in a background thread.
+        * ``'lazy'`` -- Each one only on first access of any member it
+          defines.
+
+        With ``'background'`` and ``'lazy'``, the member names are first
+        added to the class as :class:`zetup.classpackage.lazymember`
+        placeholders, which import their member module on access. If not
+        given by a `membermodules` dictionary, they are found by
+        :func:`zetup.members.member_index` in the member module sources.
+        Member modules which can't be scanned are always imported
+        eagerly.
+
+        With `cache_members`, attributes delegated to the class object are
+        cached on first access. This makes ``package.Class.member`` paths
+        faster, but later changes of class attributes are not seen until
+        ``__refresh__()`` of this class package is called.
         """
+        if import_members not in IMPORT_MEMBERS:
+            raise ValueError(
+                "import_members must be one of %s, not %s"
+                % (", ".join(map(repr, IMPORT_MEMBERS)), repr(import_members)))
         parentpkgname, classname = pkgname.rsplit('.', 1)
+        unindexed = []
+        if isinstance(membermodules, dict):
+            index = dict(
+                (name, modname) for modname, names in membermodules.items()
+                for name in names)
+        elif membermodules is not None and import_members != 'eager':
+            from .members import member_index
+
+            index, unindexed = member_index(
+                os.path.dirname(sys.modules[pkgname].__file__), classname,
+                membermodules)
+        else:
+            index = None
+
         super(classpackage, self).__init__(pkgname, [classname])
 
         pkgcls = type(self)
         pkgdict = self.__dict__
 
+        def import_membermodules(modnames=membermodules):
+            for modname in modnames:
+                import_module('%s.%s' % (pkgname, modname))
+
         def load_class():
             """Get the actual class object from this class package
-            and automatically import all defined ``membermodules``.
+            and import the defined ``membermodules``
+            like given by `import_members`.
             """
             classobj = pkgcls.__getattribute__(self, classname)
             classobj.__module__ = parentpkgname
-            if membermodules is not None:
-                for modname in membermodules:
-                    mod = import_module('%s.%s' % (pkgname, modname))
+            # store before importing member modules, which access the class
+            pkgdict[classname] = classobj
+            if membermodules is None:
+                return classobj
+
+            if index is not None and import_members != 'eager':
+                for name, modname in index.items():
+                    if name not in classobj.__dict__:
+                        setattr(classobj, name, lazymember(
+                            classobj, '%s.%s' % (pkgname, modname), name))
+            if import_members == 'eager':
+                import_membermodules()
+            elif import_members == 'lazy':
+                import_membermodules(unindexed)
+            elif import_members == 'background':
+                thread = pkgdict['__thread__'] = Thread(
+                    target=import_membermodules)
+                thread.daemon = True
+                thread.start()
             return classobj
 
+        special = SPECIAL_ATTRIBUTES
+        members = pkgdict['__members__'] = {}
+
+        def delegate(self, name):
+            # only take these few special attributes
+            # from the classpackage instance itself
+            if name in special:
+                return pkgcls.__getattribute__(self, name)
+            # get the actual class object
+            try:
+                classobj = pkgdict[classname]
+            except KeyError:
+                # only load once
+                classobj = pkgdict[classname] = load_class()
+            if name == classname:
+                return classobj
+            # and take all other attributes directly from the class object.
+            # They are not cached by default, since class attributes
+            # can change and can be descriptors with dynamic results
+            return getattr(classobj, name)
+
+        if cache_members:
+            def delegate_cached(self, name):
+                try:
+                    return members[name]
+                except KeyError:
+                    pass
+                obj = delegate(self, name)
+                if name not in special:
+                    members[name] = obj
+                return obj
+
         class package(type(self)):
             """Help tools like sphinx ``.. autoclass::`` doc generator
             by delegating (almost) all attributes to the actual class object.
@@ -106,25 +246,13 @@ class classpackage(package):
               ``package.Class`` in imported modules and therefore
               doesn't get the actual class object itself.
             """
-            def __getattribute__(self, name):
-                if name == classname:
-                    # get the actual class object
-                    try:
-                        return pkgdict[classname]
-                    except KeyError:
-                        # only load once
-                        classobj = pkgdict[classname] = load_class()
-                        return classobj
-                # only take these few special attributes
-                # from the classpackage instance itself
-                if name in [
-                        '__name__', '__all__',  '__module__', '__path__',
-                        '__file__', '__class__', '__dict__',
-                ]:
-                    return pkgcls.__getattribute__(self, name)
-                # and take all other attributes from the class object
-                # (by first recursively calling this __getattribute__)
-                return getattr(getattr(self, classname), name)
+            __getattribute__ = delegate_cached if cache_members else delegate
+
+            def __refresh__(self):
+                """Also forget the cached class attributes.
+                """
+                members.clear()
+                pkgcls.__refresh__(self)
 
             def __repr__(self):
                 return "<%s for %s from %s>" % (
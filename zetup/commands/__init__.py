@@ -38,6 +38,7 @@ from .dev import dev
 from .pytest import pytest
 from .tox import tox
 from .conda import conda
+from .resolve import resolve_
 
 
 @command
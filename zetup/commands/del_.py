@@ -26,12 +26,12 @@ Defines ``zetup del`` command.
 import sys
 import os
 
-import pkg_resources
 import pip
 
 from path import Path
 
 from zetup.zetup import Zetup
+from zetup.installed import distribution_index
 from zetup.commands.command import command
 from zetup.conda import conda
 
@@ -58,12 +58,12 @@ def del_(zfg, args=None):
             if status:  # ==> error
                 return status
     # is there some project (develop) install (left) to be removed via pip?
+    index = distribution_index()
     while True:
-        try:
-            # always use a refreshed working set
-            # (interface to installed python package distributions)
-            dist = pkg_resources.WorkingSet().by_key[zfg.NAME]
-        except KeyError:  # ==> nothing left to uninstall
+        # always use a refreshed entry
+        # of the installed python package distribution
+        dist = index.refresh(zfg.NAME)
+        if dist is None:  # ==> nothing left to uninstall
             break
         status = pip.main(['uninstall', zfg.NAME, '--yes'])
         if status:  # ==> error
@@ -71,6 +71,6 @@ def del_(zfg, args=None):
         root = Path(dist.location)
         if root.exists() and root.samefile(zfg.ZETUP_DIR):
             # pip doesn't remove local .egg-info/ dirs of develop installs
-            egg_info = Path(dist._provider.egg_info).realpath()
+            egg_info = Path(dist.metadata).realpath()
             print("zetup: Removing %s%s" % (egg_info, os.path.sep))
             egg_info.rmtree()
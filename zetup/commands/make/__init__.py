@@ -45,8 +45,17 @@ class Loader(FileSystemLoader):
 
 
 class Made(list):
-    def __init__(self):
+    def __init__(self, zfg=None):
         self.status = 0
+        self.zfg = zfg
+
+    def changed(self):
+        """Forget cached package scans of the zetup config
+           after creating or removing made files.
+        """
+        packages = self.zfg and self.zfg.PACKAGES
+        if packages:
+            packages.scan.clear()
 
     def clean(self):
         for path in self:
@@ -55,6 +64,7 @@ class Made(list):
                       # don't pollute stdout
                       file=sys.stderr)
                 path.remove()
+                self.changed()
             if path.ext == '.py':
                 compiled = []
                 path = path.splitext()[0] + '.pyc'
@@ -101,7 +111,18 @@ def make(zfg, args=None, targets=None, force=None, skip_existing=False):
                    if tpath.endswith('.jinja')]
         skip_existing = True
 
-    made = Made()
+    # should the zetup config module load its config from a snapshot?
+    snapshot = zfg.ZETUP_CONFIG_SNAPSHOT
+    if 'zetup_config_snapshot' in targets or 'zfg_snapshot' in targets:
+        snapshot = True
+        targets = [t for t in targets if t not in [
+            'zetup_config_snapshot', 'zfg_snapshot']] + ['zetup_config']
+    if snapshot and 'package/zetup_config.json' not in targets and any(
+            t in targets for t in [
+                'zetup_config', 'zfg', 'package/zetup_config.py']):
+        targets = list(targets) + ['package/zetup_config.json']
+
+    made = Made(zfg)
     for target in targets:
         if zfg.NO_MAKE and target in zfg.NO_MAKE:
             continue
@@ -112,6 +133,10 @@ def make(zfg, args=None, targets=None, force=None, skip_existing=False):
                 target = 'package/zetup_config.py'
             else:
                 continue
+        elif target == 'package/zetup_config.json':
+            if not snapshot or zfg.ZETUP_CONFIG_PACKAGE \
+                    or not zfg.ZETUP_CONFIG_MODULE:
+                continue
         if zfg.PACKAGES:
             target = re.sub(
               '^%s/' % zfg.PACKAGES.main, 'package/', target)
@@ -150,8 +175,10 @@ def make(zfg, args=None, targets=None, force=None, skip_existing=False):
             """),
             'zetup': zetup,
             'zfg': zfg,
+            'snapshot': snapshot,
         })
         path.write_text(text.strip())
+        made.changed()
         if not zfg.KEEP_MADE or target not in zfg.KEEP_MADE:
             made.append(path)
 
@@ -0,0 +1,67 @@
+# zetup.py
+#
+# Zimmermann's Python package setup.
+#
+# Copyright (C) 2014-2015 Stefan Zimmermann <zimmermann.code@gmail.com>
+#
+# zetup.py is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# zetup.py is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with zetup.py. If not, see <http://www.gnu.org/licenses/>.
+"""zetup.commands.resolve
+
+Defines ``zetup resolve`` command.
+
+.. moduleauthor:: Stefan Zimmermann <zimmermann.code@gmail.com>
+"""
+import os
+
+from zetup.zetup import Zetup
+from zetup.requires import Requirements
+from zetup.resolve import resolve
+
+__all__ = ['resolve_']
+
+
+@Zetup.command(name='resolve', args=[
+    ('--plan', {
+        'action': 'store_true',
+        'help': "only show what would be fetched",
+    }),
+    ('--json', {
+        'metavar': 'FILE',
+        'help': "write JSON report to FILE ('-' for stdout)",
+    }),
+])
+def resolve_(zfg, args=None):
+    """Resolve setup requirements and show where time is spent.
+    """
+    path = os.path.join(zfg.ZETUP_DIR, 'requirements.setup.txt')
+    if not os.path.exists(path):
+        return 0
+
+    with open(path) as f:
+        # not using zfg.SETUP_REQUIRES, which resolves on first access
+        reqs = Requirements(f.read(), zfg=zfg)
+    egg_cache = zfg.EGG_CACHE and os.path.join(
+        zfg.ZETUP_DIR, os.path.expanduser(zfg.EGG_CACHE))
+    plan = resolve(reqs, egg_cache=egg_cache, plan=args and args.plan)
+
+    if args and args.json == '-':
+        print(plan.json)
+        return 0
+
+    print(plan)
+    print("Total: %.3fs" % plan.time)
+    if args and args.json:
+        with open(args.json, 'w') as f:
+            f.write(plan.json)
+    return 0
@@ -17,13 +17,17 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with zetup.py. If not, see <http://www.gnu.org/licenses/>.
 
-__all__ = ['load_zetup_config']
+__all__ = [
+    'load_zetup_config', 'read_zetup_config', 'load_zetup_config_snapshot',
+    'LazyConfig']
 
 import sys
 import os
 import re
+import json
 from textwrap import dedent
 from collections import OrderedDict
+from types import ModuleType
 from warnings import warn
 if sys.version_info[0] == 3:
     from configparser import ConfigParser
@@ -38,8 +42,9 @@ from .extras import Extras
 from .dist import Distribution
 from .package import Packages
 from .notebook import Notebook
-from .resolve import resolve
 from .error import ZetupError
+from .cache import Cache, _native
+from . import scm
 
 
 TRUE = True, 'true', 'yes'
@@ -49,26 +54,48 @@ FALSE = False, 'false', 'no'
 CONFIG_FILE_NAMES = ['zetuprc', 'zetup.cfg', 'zetup.ini']
 
 
+#: Format version of zetup config snapshot data files.
+#  Increase on incompatible changes
+SNAPSHOT_FORMAT = 2
+
+#: Types of objects stored in zetup config snapshots by name
+SNAPSHOT_TYPES = {cls.__name__: cls for cls in [
+    Version, Distribution, Requirements, Extras, Packages]}
+
+
 class ZetupConfigNotFound(ZetupError):
     pass
 
 
-def load_zetup_config(path, zfg):
-    """Load zetup config from directory in `path`
-       and store keywords as attributes to `zfg` object.
+#: Persistent cache of raw zetup config data by real config directory path
+CONFIG_CACHE = Cache('config', disable_env='ZETUP_NO_CONFIG_CACHE')
+
+
+def read_zetup_config(path):
+    """Read the raw zetup config data from directory in `path`
+       without creating any config objects.
+
+    - Reads the zetup config file, VERSION and requirements files,
+      and lists extra requirements files and notebooks.
+    - Gets the version from repository via :func:`zetup.scm.get_version`
+      if there is no VERSION file.
+    - Returns a tuple of a JSON-serializable data dictionary,
+      the list of all file paths the data was derived from,
+      and a flag telling if those paths are sufficient
+      for detecting changes, which is required for caching the data.
     """
-    zfg.ZETUP_DIR = path
+    data = {}
+    inputs = [path]  # directory listing changes on adding/removing files
+    cacheable = True
 
-    # Read the zetup config...
     config = ConfigParser()
     for fname in CONFIG_FILE_NAMES:
-        zfg.ZETUP_FILE = os.path.join(zfg.ZETUP_DIR, fname)
-        if config.read(zfg.ZETUP_FILE):
+        zetup_file = os.path.join(path, fname)
+        inputs.append(zetup_file)
+        if config.read(zetup_file):
             ##TODO: No print if run from installed package (under pkg/zetup/):
             ## print("zetup: Using config from %s" % fname)
-
-            # The config file will be installed as pkg.zetup package_data:
-            zfg.ZETUP_DATA = [fname]
+            data['file'] = fname
             break
     else:
         raise ZetupConfigNotFound(
@@ -77,13 +104,159 @@ def load_zetup_config(path, zfg):
             ", ".join(map(repr, CONFIG_FILE_NAMES[:-1])),
             repr(CONFIG_FILE_NAMES[-1])]))
 
-    #... and store all setup options in UPPERCASE vars...
-    zfg.NAME = config.sections()[0]
-
+    data['name'] = name = config.sections()[0]
     # get a section dictionary with normalized option names as keys
     # and stripped value strings
-    config = {re.sub(r'[^a-z0-9]', '', option.lower()): value.strip()
-              for option, value in config.items(zfg.NAME)}
+    data['options'] = {
+        re.sub(r'[^a-z0-9]', '', option.lower()): value.strip()
+        for option, value in config.items(name)}
+
+    version_file = os.path.join(path, 'VERSION')
+    inputs.append(version_file)
+    if os.path.exists(version_file):
+        data['in_repo'] = False
+        data['version'] = open(version_file).read().strip()
+    else:
+        data['in_repo'] = True
+        try:
+            data['version'] = scm.get_version(path)
+        except ImportError:
+            warn(dedent(
+                """No 'setuptools_scm' package found.
+                   Zetup needs it to get project version from repository.
+                """))
+            data['version'] = None
+            # don't cache the missing version, which is fixed by installing
+            cacheable = False
+        else:
+            scm_inputs = scm.inputs(path)
+            if scm_inputs is None:
+                cacheable = False
+            else:
+                inputs += scm_inputs
+
+    data['requirements'] = requirements = {}
+    data['extras'] = extras = []
+    data['notebooks'] = notebooks = []
+    for fname in sorted(os.listdir(path)):
+        match = re.match(r'^requirements(\.(?P<name>[^\.]+))?\.txt$', fname)
+        if match:
+            extra = match.group('name')
+            req_txt = os.path.join(path, fname)
+            inputs.append(req_txt)
+            requirements[extra or ''] = open(req_txt).read()
+            if extra and extra != 'setup':
+                # setup requirements are stored in SETUP_REQUIRES
+                extras.append([extra, fname])
+        elif os.path.splitext(fname)[1] == '.ipynb':
+            notebooks.append(fname)
+
+    return data, inputs, cacheable
+
+
+class LazyConfig(OrderedDict):
+    """Lazily evaluated zetup config fields.
+
+    - Stores functions creating the config values by field names.
+    - Each function is only called on first access of the field
+      and its result is stored as attribute of the zetup config object.
+    - Works with :class:`zetup.Zetup` instances, which look up missing
+      attributes here, and with generated zetup config modules,
+      for which module-level ``__getattr__`` and ``__dir__`` are installed
+      (in PY < 3.7, fields of modules are evaluated immediately).
+    """
+    def __init__(self, zfg, fields=()):
+        """Create lazy `fields` from ``(name, func)`` pairs for `zfg`.
+        """
+        super(LazyConfig, self).__init__()
+        self.zfg = zfg
+        zfg.ZETUP_LAZY = self
+        # PY < 3.7 doesn't support module-level __getattr__
+        self.eager = isinstance(zfg, ModuleType) \
+            and sys.version_info < (3, 7)
+        if isinstance(zfg, ModuleType) and not self.eager:
+            zfg.__getattr__ = self.getattr
+            zfg.__dir__ = self.dir
+        for name, func in fields:
+            self.add(name, func)
+
+    def add(self, name, func):
+        """Add a lazy field `name` whose value is created by calling `func`.
+
+        - In eager mode, fields must be added in order of their dependencies.
+        """
+        self[name] = func
+        if self.eager:
+            self.evaluate(name)
+
+    def field(self, func):
+        """Decorator for adding a lazy field named like the given `func`.
+        """
+        self.add(func.__name__, func)
+        return func
+
+    def evaluate(self, name):
+        """Create the value of field `name`
+           and store it as attribute of the zetup config object.
+        """
+        value = self[name]()
+        setattr(self.zfg, name, value)
+        self.pop(name, None)
+        return value
+
+    def evaluate_all(self):
+        """Create all remaining field values.
+
+        - Doesn't override any attributes explicitly set in the meantime.
+        """
+        for name in list(self):
+            if name in vars(self.zfg):
+                self.pop(name, None)
+            elif name in self:  # ==> not evaluated as dependency meanwhile
+                self.evaluate(name)
+
+    def getattr(self, name):
+        if name in self:
+            return self.evaluate(name)
+
+        raise AttributeError("%s has no attribute %s"
+                             % (repr(self.zfg), repr(name)))
+
+    def dir(self):
+        return sorted(set(vars(self.zfg)).union(self))
+
+
+def load_zetup_config(path, zfg):
+    """Load zetup config from directory in `path`
+       and store keywords as attributes to `zfg` object.
+
+    - The raw config data is cached persistently (see :mod:`zetup.cache`)
+      and only read again if any of its input files change.
+    - Stores the stat signatures of all input files as ``ZETUP_INPUTS``
+      or ``None`` if changes can't be detected.
+    - All fields creating objects are only evaluated on first access
+      (see :class:`LazyConfig`).
+    """
+    zfg.ZETUP_DIR = path
+
+    key = os.path.realpath(path)
+    data, zfg.ZETUP_INPUTS = CONFIG_CACHE.load(key, with_inputs=True)
+    if data is None:
+        data, inputs, cacheable = read_zetup_config(path)
+        if cacheable:
+            zfg.ZETUP_INPUTS = CONFIG_CACHE.store(key, data, inputs)
+
+    zfg.ZETUP_FILE = os.path.join(zfg.ZETUP_DIR, data['file'])
+    # The config file will be installed as pkg.zetup package_data,
+    # together with VERSION and requirements files...
+    zfg.ZETUP_DATA = [data['file'], 'VERSION', 'requirements.txt']
+    zfg.ZETUP_DATA += [fname for _, fname in data['extras']]
+    if 'README.ipynb' in data['notebooks']:
+        zfg.ZETUP_DATA.append('README.ipynb')
+
+    #... and store all setup options in UPPERCASE vars...
+    zfg.NAME = data['name']
+    config = data['options']
 
     zfg.TITLE = config.get('title', zfg.NAME)
     zfg.DESCRIPTION = config.get('description', '').replace('\n', ' ')
@@ -100,59 +273,10 @@ def load_zetup_config(path, zfg):
 
     zfg.PYTHON = config.get('python', '').split()
 
-    zfg.PACKAGES = config.get(
-        'packages', Packages([], root=zfg.ZETUP_DIR, zfg=zfg))
-    if zfg.PACKAGES:
-        # First should be the root package
-        zfg.PACKAGES = Packages(zfg.PACKAGES, root=zfg.ZETUP_DIR, zfg=zfg)
-    elif os.path.isdir(os.path.join(zfg.ZETUP_DIR, *zfg.NAME.split('.'))):
-        # Just assume distribution name == root package name
-        zfg.PACKAGES = Packages([zfg.NAME], root=zfg.ZETUP_DIR, zfg=zfg)
-
     zfg.MODULES = (
         config.get('modules', '') or config.get('pymodules', '')
     ).split()
 
-    zfg.ZETUP_CONFIG_PACKAGE = config.get('zetupconfigpackage')
-    if zfg.ZETUP_CONFIG_PACKAGE:
-        if zfg.ZETUP_CONFIG_PACKAGE in TRUE:
-            zfg.ZETUP_CONFIG_PACKAGE = zfg.PACKAGES.main + '.zetup_config'
-        elif zfg.ZETUP_CONFIG_PACKAGE in FALSE:
-            zfg.ZETUP_CONFIG_PACKAGE = False
-        # else it defines a custom package
-
-    zfg.ZETUP_CONFIG_MODULE = config.get('zetupconfigmodule', 'yes')
-    if zfg.ZETUP_CONFIG_MODULE:
-        if zfg.ZETUP_CONFIG_MODULE in TRUE:
-            if not zfg.PACKAGES:
-                raise ZetupError(
-                    "Can't add a default .zetup_config submodule"
-                    " if no package is defined.")
-            zfg.ZETUP_CONFIG_MODULE = zfg.PACKAGES.main + '.zetup_config'
-        elif zfg.ZETUP_CONFIG_MODULE in FALSE:
-            zfg.ZETUP_CONFIG_MODULE = False
-        # else it defines a custom module
-
-    zfg.SCRIPTS = config.get('scripts')
-    if zfg.SCRIPTS:
-        lines = list(map(str.strip, zfg.SCRIPTS.split('\n')))
-        zfg.SCRIPTS = {}
-        for line in lines:
-            if not line:
-                continue
-            name, source = map(str.strip, line.split(':', 1))
-            zfg.SCRIPTS[name] = source
-
-    zfg.SETUP_KEYWORDS = config.get('setupkeywords')
-    if zfg.SETUP_KEYWORDS:
-        lines = list(map(str.strip, zfg.SETUP_KEYWORDS.split('\n')))
-        zfg.SETUP_KEYWORDS = {}
-        for line in lines:
-            if not line:
-                continue
-            name, source = map(str.strip, line.split(':', 1))
-            zfg.SETUP_KEYWORDS[name] = source
-
     zfg.ZETUP_CONFIG_HOOKS = config.get('zetupconfighooks', '').split()
 
     zfg.SETUP_HOOKS = config.get('setuphooks', '').split()
@@ -161,6 +285,10 @@ def load_zetup_config(path, zfg):
 
     zfg.KEEP_MADE = config.get('keepmade', '').split()
 
+    zfg.ZETUP_CONFIG_SNAPSHOT = config.get('zetupconfigsnapshot', False) in TRUE
+
+    zfg.EGG_CACHE = config.get('eggcache') or None
+
     zfg.FORCE_MAKE = config.get('forcemake', True)
     if zfg.FORCE_MAKE is not True:
         if zfg.FORCE_MAKE in TRUE:
@@ -176,95 +304,139 @@ def load_zetup_config(path, zfg):
         str.strip, config.get('testcommands', 'py.test -v test').split('\n')
     )))
 
-    # get all non-empty classifier lines
-    # (lines starting with :: are interpreted as continuation)
-    zfg.CLASSIFIERS = list(filter(None, (
-        line.strip() for line in re.sub(
-            '\n\w*::', ' ::', config.get('classifiers', '').strip()
-        ).split('\n'))))
-    zfg.CLASSIFIERS.append('Programming Language :: Python')
-    for pyversion in zfg.PYTHON:
-        zfg.CLASSIFIERS.append(
-            'Programming Language :: Python :: ' + pyversion)
-
-    zfg.KEYWORDS = config.get('keywords', '').split()
-    if any(pyversion.startswith('3') for pyversion in zfg.PYTHON):
-        zfg.KEYWORDS.append('python3')
-
-    # Parse VERSION and requirements files
-    #  and add them to pkg.zetup package_data...
-    zfg.ZETUP_DATA += ['VERSION', 'requirements.txt']
-
-    zfg.VERSION_FILE = os.path.join(zfg.ZETUP_DIR, 'VERSION')
-    if os.path.exists(zfg.VERSION_FILE):
-        zfg.in_repo = False
-        zfg.VERSION = open(zfg.VERSION_FILE).read().strip()
-    else:
-        zfg.in_repo = True
+    zfg.in_repo = data['in_repo']
+    if zfg.in_repo:
         zfg.VERSION_FILE = None
-        try:
-            import setuptools_scm
-        except ImportError:
-            warn(dedent(
-                """No 'setuptools_scm' package found.
-                   Zetup needs it to get project version from repository.
-                """))
-            zfg.VERSION = None
-        else:
-            version = setuptools_scm.get_version(root=zfg.ZETUP_DIR)
-            # the hyphen-revision-hash part after .dev# version strings
-            # results in wrong version comparisons
-            # via pkg_resources.parse_version()
-            zfg.VERSION = version and re.split('[-+]', version)[0]
-    if zfg.VERSION:
-        zfg.VERSION = Version(zfg.VERSION)
-
-    zfg.DISTRIBUTION = Distribution(zfg)
-
-    req_setup_txt = os.path.join(zfg.ZETUP_DIR, 'requirements.setup.txt')
-    if os.path.exists(req_setup_txt):
-        zfg.SETUP_REQUIRES = Requirements(
-            open(req_setup_txt).read(), zfg=zfg)
     else:
-        zfg.SETUP_REQUIRES = None
+        zfg.VERSION_FILE = os.path.join(zfg.ZETUP_DIR, 'VERSION')
 
-    req_txt = os.path.join(zfg.ZETUP_DIR, 'requirements.txt')
-    if os.path.exists(req_txt):
-        zfg.REQUIRES = Requirements(open(req_txt).read(), zfg=zfg)
-    else:
-        zfg.REQUIRES = None
+    lazy = LazyConfig(zfg)
 
-    # Look for optional extra requirements to use with setup's extras_require=
-    zfg.EXTRAS = Extras(zfg=zfg)
-    for fname in sorted(os.listdir(zfg.ZETUP_DIR)):
-        match = re.match(r'^requirements\.(?P<name>[^\.]+)\.txt$', fname)
-        if match:
-            name = match.group('name')
-            if name == 'setup':
-                # already handled in SETUP_REQUIRES
-                continue
-
-            zfg.ZETUP_DATA.append(fname)
-
-            zfg.EXTRAS[name] = Requirements(
-                open(os.path.join(zfg.ZETUP_DIR, fname)).read())
-
-    # Are there IPython notebooks?
-    zfg.NOTEBOOKS = OrderedDict()
-    for fname in sorted(os.listdir(zfg.ZETUP_DIR)):
-        name, ext = os.path.splitext(fname)
-        if ext == '.ipynb':
-            if name == 'README':
-                zfg.ZETUP_DATA.append(fname)
-            zfg.NOTEBOOKS[name] \
-                = Notebook(os.path.join(zfg.ZETUP_DIR, fname))
-
-    # finally resolve setup requirements...
-    if zfg.SETUP_REQUIRES:
-        resolve(zfg.SETUP_REQUIRES)
-
-    # ... and run any custom zetup config hooks
+    @lazy.field
+    def PACKAGES():
+        packages = config.get('packages')
+        if packages:
+            # First should be the root package
+            return Packages(packages, root=zfg.ZETUP_DIR, zfg=zfg)
+
+        if os.path.isdir(os.path.join(zfg.ZETUP_DIR, *zfg.NAME.split('.'))):
+            # Just assume distribution name == root package name
+            return Packages([zfg.NAME], root=zfg.ZETUP_DIR, zfg=zfg)
+
+        return Packages([], root=zfg.ZETUP_DIR, zfg=zfg)
+
+    @lazy.field
+    def ZETUP_CONFIG_PACKAGE():
+        package = config.get('zetupconfigpackage')
+        if package:
+            if package in TRUE:
+                return zfg.PACKAGES.main + '.zetup_config'
+
+            if package in FALSE:
+                return False
+
+        # else it defines a custom package
+        return package
+
+    @lazy.field
+    def ZETUP_CONFIG_MODULE():
+        module = config.get('zetupconfigmodule', 'yes')
+        if module:
+            if module in TRUE:
+                if not zfg.PACKAGES:
+                    raise ZetupError(
+                        "Can't add a default .zetup_config submodule"
+                        " if no package is defined.")
+                return zfg.PACKAGES.main + '.zetup_config'
+
+            if module in FALSE:
+                return False
+
+        # else it defines a custom module
+        return module
+
+    @lazy.field
+    def SCRIPTS():
+        return _parse_entry_points(config.get('scripts'))
+
+    @lazy.field
+    def SETUP_KEYWORDS():
+        return _parse_entry_points(config.get('setupkeywords'))
+
+    @lazy.field
+    def CLASSIFIERS():
+        # get all non-empty classifier lines
+        # (lines starting with :: are interpreted as continuation)
+        classifiers = list(filter(None, (
+            line.strip() for line in re.sub(
+                '\n\w*::', ' ::', config.get('classifiers', '').strip()
+            ).split('\n'))))
+        classifiers.append('Programming Language :: Python')
+        for pyversion in zfg.PYTHON:
+            classifiers.append(
+                'Programming Language :: Python :: ' + pyversion)
+        return classifiers
+
+    @lazy.field
+    def KEYWORDS():
+        keywords = config.get('keywords', '').split()
+        if any(pyversion.startswith('3') for pyversion in zfg.PYTHON):
+            keywords.append('python3')
+        return keywords
+
+    @lazy.field
+    def VERSION():
+        return data['version'] and Version(data['version'])
+
+    @lazy.field
+    def DISTRIBUTION():
+        return Distribution(zfg)
+
+    requirements = data['requirements']
+
+    @lazy.field
+    def SETUP_REQUIRES():
+        if 'setup' not in requirements:
+            return None
+
+        from .resolve import resolve
+
+        reqs = Requirements(requirements['setup'], zfg=zfg)
+        # make sure that setup requirements are available
+        # as soon as anything is interested in them
+        egg_cache = zfg.EGG_CACHE and os.path.join(
+            zfg.ZETUP_DIR, os.path.expanduser(zfg.EGG_CACHE))
+        resolve(reqs, egg_cache=egg_cache)
+        return reqs
+
+    @lazy.field
+    def REQUIRES():
+        if '' not in requirements:
+            return None
+
+        return Requirements(requirements[''], zfg=zfg)
+
+    @lazy.field
+    def EXTRAS():
+        # optional extra requirements to use with setup's extras_require=
+        extras = Extras(zfg=zfg)
+        for name, _ in data['extras']:
+            extras[name] = requirements[name]
+        return extras
+
+    @lazy.field
+    def NOTEBOOKS():
+        # Are there IPython notebooks?
+        notebooks = OrderedDict()
+        for fname in data['notebooks']:
+            notebooks[os.path.splitext(fname)[0]] = Notebook(
+                os.path.join(zfg.ZETUP_DIR, fname))
+        return notebooks
+
+    # finally run any custom zetup config hooks,
+    # which might need the setup requirements
     if zfg.ZETUP_CONFIG_HOOKS:
+        zfg.SETUP_REQUIRES
         sys.path.insert(0, zfg.ZETUP_DIR)
         for hook in zfg.ZETUP_CONFIG_HOOKS:
             modname, funcname = hook.split(':')
@@ -273,3 +445,55 @@ def load_zetup_config(path, zfg):
                 mod = getattr(mod, subname)
             func = getattr(mod, funcname)
             func(zfg)
+
+
+def load_zetup_config_snapshot(path, zfg):
+    """Load zetup config from snapshot data file in `path`
+       and store keywords as attributes to `zfg` object.
+
+    - Snapshots are written by ``zetup make zetup_config_snapshot``
+      (see :attr:`zetup.Zetup.config_snapshot`).
+    - Objects are lazily recreated from their pre-parsed snapshots
+      (see :class:`LazyConfig`).
+    """
+    with open(path) as f:
+        snapshot = _native(json.load(f))
+    if snapshot.get('format') != SNAPSHOT_FORMAT:
+        raise ZetupError(
+            "Unsupported format of zetup config snapshot %s: %s (need %s)"
+            % (repr(path), snapshot.get('format'), SNAPSHOT_FORMAT))
+
+    for name, value in snapshot['fields'].items():
+        setattr(zfg, name, value)
+
+    # the snapshot is stored next to zetup config module
+    root = os.path.realpath(path)
+    for _ in range(snapshot['module'].count('.') + 1):
+        root = os.path.dirname(root)
+
+    lazy = LazyConfig(zfg)
+    for name, (typename, data) in sorted(snapshot['objects'].items()):
+        cls = SNAPSHOT_TYPES[typename]
+
+        def create(cls=cls, data=data):
+            if cls is Packages:
+                return cls.from_snapshot(data, root=root, zfg=zfg)
+
+            return cls.from_snapshot(data, zfg=zfg)
+
+        lazy.add(name, create)
+
+
+def _parse_entry_points(text):
+    """Get a dictionary of ``name: source`` lines from config option `text`.
+    """
+    if not text:
+        return text
+
+    entry_points = {}
+    for line in map(str.strip, text.split('\n')):
+        if not line:
+            continue
+        name, source = map(str.strip, line.split(':', 1))
+        entry_points[name] = source
+    return entry_points
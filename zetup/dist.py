@@ -21,17 +21,14 @@ from __future__ import absolute_import, print_function
 
 import os
 
-import pkg_resources
-from pkg_resources import (
-  get_distribution, DistributionNotFound, VersionConflict)
-
 from .version import Version
+from .installed import distribution_index
 
 __all__ = ['Distribution']
 
 
 class Distribution(str):
-    """Simple proxy to get a pkg_resources.Distribution instance
+    """Simple proxy to get a :class:`zetup.installed.InstalledDistribution`
        matching dist name and version from a zetup config object.
     """
     def __new__(cls, zfg_or_name, mainpkg=None, version=None):
@@ -65,6 +62,8 @@ class Distribution(str):
     def find(self, modpath, raise_=True):
         """Try to find the distribution and check version.
 
+        - Looks up the distribution in the shared
+          :func:`zetup.installed.distribution_index`.
         - Also checks if distribution is in the same directory
           as given `modpath`.
         - Automatically reinstalls zetup in develop mode
@@ -79,19 +78,21 @@ class Distribution(str):
         # If no version is given (for whatever reason), just do nothing:
         if not self.version:
             return None
-        try:
-            dist = get_distribution(self)
-        except DistributionNotFound:
+        index = distribution_index()
+        dist = index.find(self)
+        if dist is None:
             return None
         # check if distribution path matches package path
         if os.path.normcase(os.path.realpath(dist.location)) \
           != os.path.normcase(os.path.dirname(os.path.realpath(modpath))):
             return None
-        if dist.parsed_version != self.version.parsed:
+        # a distribution without version metadata can't match either
+        if dist.version is None or Version(dist.version) != self.version:
             message = (
-                "Version of distribution %s "
+                "Version of distribution %s %s (%s) "
                 "doesn't match version %s from %s. "
-                % (repr(dist), self.version, repr(self.zfg)))
+                % (dist.name, dist.version, dist.location, self.version,
+                   repr(self.zfg)))
             # are we handling zetup's own config?
             if self == 'zetup':
                 from zetup.zetup import Zetup
@@ -102,18 +103,30 @@ class Distribution(str):
                     print('zetup: Reinstalling in develop mode...')
                     import zetup.commands.dev
                     self.zfg.dev()
-                    # reset setuptools distribution cache
-                    pkg_resources.working_set = pkg_resources.WorkingSet(
-                        pkg_resources.working_set.entries)
                     # and return updated dist
-                    return get_distribution(self)
+                    dist = index.refresh(self)
+                    return dist
 
             elif raise_:
+                from .requires import Requirement, VersionConflict
+
                 raise VersionConflict(
-                    message + "Please reinstall %s." % str.__repr__(self))
+                    Requirement('%s==%s' % (dist.project_name, self.version)),
+                    dist.version, repr(self.zfg), reason=message
+                    + "Please reinstall %s." % str.__repr__(self))
             return None
         return dist
 
     @property
     def py(self):
         return '%s(zfg)' % (type(self).__name__)
+
+    @property
+    def snapshot(self):
+        """Nothing to store, since everything is taken from zetup config.
+        """
+        return None
+
+    @classmethod
+    def from_snapshot(cls, snapshot, zfg=None):
+        return cls(zfg)
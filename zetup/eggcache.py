@@ -0,0 +1,183 @@
+# ZETUP
+#
+# Zimmermann's Extensible Tools for Unified Project setups
+#
+# Copyright (C) 2014-2017 Stefan Zimmermann <user@zimmermann.co>
+#
+# ZETUP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ZETUP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with ZETUP. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Shared, content-addressed store of eggs fetched by :func:`zetup.resolve`
+
+Lets many project checkouts and CI jobs on one machine reuse setup
+requirement eggs instead of building them into every project's ``.eggs/``
+"""
+
+import sys
+import os
+import json
+import shutil
+from hashlib import sha256
+from tempfile import mkdtemp, mkstemp
+
+from pkg_resources import Environment, find_distributions
+
+from .cache import _native
+
+__all__ = ['EggCache']
+
+
+def _digest(path):
+    """
+    Get the SHA-256 hex digest of the content of file or directory `path`
+
+    Directories are hashed over their sorted relative file paths and
+    file contents
+    """
+    digest = sha256()
+    if os.path.isdir(path):
+        for root, dirnames, fnames in os.walk(path):
+            dirnames.sort()
+            for fname in sorted(fnames):
+                if fname.endswith(('.pyc', '.pyo')):
+                    continue
+                fpath = os.path.join(root, fname)
+                digest.update(os.path.relpath(fpath, path).replace(
+                    os.sep, '/').encode('utf-8') + b'\0')
+                with open(fpath, 'rb') as f:
+                    digest.update(f.read())
+    else:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class EggCache(object):
+    """
+    Directory of eggs stored under ``objects/`` by content digest, with an
+    ``index/`` of JSON files listing the stored eggs of each project
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(os.path.expanduser(path))
+
+    def index_path(self, key):
+        """
+        Get the path of the index file for project `key`
+        """
+        return os.path.join(self.path, 'index', '%s.json' % key)
+
+    def entries(self, key):
+        """
+        Get the relative paths of all stored eggs of project `key`
+        """
+        try:
+            with open(self.index_path(key)) as f:
+                return _native(json.load(f))
+        except (IOError, OSError, ValueError):
+            return []
+
+    def find(self, req):
+        """
+        Get a stored distribution matching requirement `req`, which can be
+        used by the running Python, or ``None``
+
+        Prefers the highest matching version
+        """
+        environment = Environment()
+        found = []
+        for relpath in self.entries(req.key):
+            location = os.path.join(self.path, *relpath.split('/'))
+            for dist in find_distributions(location, only=True):
+                if dist in req and environment.can_add(dist):
+                    found.append(dist)
+        if not found:
+            return None
+
+        return max(found, key=lambda dist: dist.parsed_version)
+
+    def add(self, dist):
+        """
+        Store the egg of fetched distribution `dist`
+
+        Identical eggs are stored only once. The cache is only an
+        optimization, so errors writing to it are silently ignored
+
+        Returns the path of the stored egg or ``None``
+        """
+        location = dist.location
+        if not location or not location.endswith('.egg') \
+                or not os.path.exists(location):
+            return None
+
+        try:
+            digest = _digest(location)
+            relpath = '/'.join([
+                'objects', digest[:2], digest, os.path.basename(location)])
+            target = os.path.join(self.path, *relpath.split('/'))
+            if not os.path.exists(target):
+                self._copy(location, target)
+            entries = self.entries(dist.key)
+            if relpath not in entries:
+                self._write_index(dist.key, entries + [relpath])
+        except (IOError, OSError, shutil.Error):
+            return None
+
+        return target
+
+    @staticmethod
+    def _copy(location, target):
+        """
+        Copy egg file or directory `location` to `target` via a temporary
+        sibling, so that concurrent processes never see partial eggs
+        """
+        parent = os.path.dirname(target)
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
+        tmpdir = mkdtemp(dir=parent, suffix='.tmp')
+        try:
+            tmppath = os.path.join(tmpdir, os.path.basename(target))
+            if os.path.isdir(location):
+                shutil.copytree(location, tmppath)
+            else:
+                shutil.copy2(location, tmppath)
+            try:
+                os.rename(tmppath, target)
+            except OSError:
+                if not os.path.exists(target):
+                    raise
+                # ==> stored by concurrent process in the meantime
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def _write_index(self, key, entries):
+        """
+        Atomically replace the index file of project `key`
+        """
+        path = self.index_path(key)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        fd, tmppath = mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entries, f)
+        if sys.version_info[0] == 3:
+            os.replace(tmppath, path)
+        else:
+            # PY2 has no atomic replacement on Windows
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(tmppath, path)
+
+    def __repr__(self):
+        return "<%s at %s>" % (type(self).__name__, repr(self.path))
@@ -19,32 +19,93 @@
 
 __all__ = ['Extras']
 
-from itertools import chain
 from collections import OrderedDict
 
 from .requires import Requirements
+from .installed import normalize
 
 
 class Extras(OrderedDict):
     """Package extra features/requirements manager.
 
     - Stores :class:`Requirements` instances by extra feature name keys.
-    - Provides an implicit 'all' key, returning a dynamically created
-      combined :class:`Requirements` instance with all extra requirements.
+    - Provides an implicit 'all' key, returning a combined
+      :class:`Requirements` instance with all extra requirements,
+      which is cached until an extra feature gets set or deleted,
+      or any stored :class:`Requirements` instance changes in-place.
     """
     def __init__(self, mapping=(), zfg=None):
         self.zfg = zfg
+        self._all = self._provenance = self._revisions = None
         super(Extras, self).__init__(mapping)
 
+    def _invalidate(self):
+        self._all = self._provenance = self._revisions = None
+
+    def _outdated(self):
+        """Check if the cached combination is missing or outdated
+           because of in-place changes of stored :class:`Requirements`.
+        """
+        return self._all is None or self._revisions != [
+            reqs.revision for reqs in self.values()]
+
     def __setitem__(self, name, text):
         reqs = Requirements(text, zfg=self.zfg)
         super(Extras, self).__setitem__(name, reqs)
+        self._invalidate()
+
+    def __delitem__(self, name):
+        super(Extras, self).__delitem__(name)
+        self._invalidate()
+
+    def pop(self, *args):
+        self._invalidate()
+        return super(Extras, self).pop(*args)
+
+    def popitem(self, *args):
+        self._invalidate()
+        return super(Extras, self).popitem(*args)
+
+    def clear(self):
+        self._invalidate()
+        super(Extras, self).clear()
+
+    def _combine(self):
+        """Create the cached combination of all extra requirements
+           and the mapping of normalized project names
+           to the names of the extra features requiring them.
+        """
+        reqs = Requirements([], zfg=self.zfg)
+        provenance = OrderedDict()
+        for name, extra in self.items():
+            reqs += extra
+            for req in extra:
+                names = provenance.setdefault(normalize(req.key), [])
+                if name not in names:
+                    names.append(name)
+        self._all, self._provenance = reqs, provenance
+        self._revisions = [extra.revision for extra in self.values()]
 
     def __getitem__(self, name):
         if name == 'all':
-            return Requirements(chain(*self.values()), zfg=self.zfg)
+            if self._outdated():
+                self._combine()
+            return self._all
         return super(Extras, self).__getitem__(name)
 
+    def provenance(self, name):
+        """Get the list of extra feature names requiring
+           the distribution with given `name`.
+
+        - Raises ``KeyError`` if not required by any extra feature.
+        """
+        if self._outdated():
+            self._combine()
+        try:
+            return list(self._provenance[normalize(name)])
+        except KeyError:
+            raise KeyError(name)
+
     @property
     def py(self):
         return '%s([\n%s\n], zfg=zfg)' % (type(self).__name__, ',\n'.join(
@@ -53,6 +114,23 @@ class Extras(OrderedDict):
               ## '%s #import %s' % (req, req.impname) for req in reqs))
           for name, reqs in self.items()))
 
+    @property
+    def snapshot(self):
+        """Get JSON-serializable ``[name, requirements snapshot]`` items
+           (see :attr:`zetup.requires.Requirements.snapshot`).
+        """
+        return [[name, reqs.snapshot] for name, reqs in self.items()]
+
+    @classmethod
+    def from_snapshot(cls, snapshot, zfg=None):
+        """Create instance from `snapshot` as returned by :attr:`.snapshot`.
+        """
+        self = cls(zfg=zfg)
+        for name, reqs in snapshot:
+            OrderedDict.__setitem__(
+                self, name, Requirements.from_snapshot(reqs, zfg=zfg))
+        return self
+
     def __repr__(self):
         return "\n\n".join((
           "[%s]\n" % key + '\n'.join(map(str, reqs))
@@ -0,0 +1,262 @@
+# ZETUP
+#
+# Zimmermann's Extensible Tools for Unified Project setups
+#
+# Copyright (C) 2014-2017 Stefan Zimmermann <user@zimmermann.co>
+#
+# ZETUP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ZETUP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with ZETUP. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Index of installed distributions, built from their metadata directories
+
+Scans the ``sys.path`` entries for ``.dist-info`` and ``.egg-info`` metadata
+and ``.egg`` directories once, without importing anything, and maps
+normalized distribution names to versions and locations
+"""
+
+import sys
+import os
+import re
+from collections import namedtuple
+
+__all__ = ['InstalledDistribution', 'DistributionIndex', 'distribution_index',
+           'normalize']
+
+
+def normalize(name):
+    """
+    Normalize a distribution `name` for lookups like described in PEP 503
+    """
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+class InstalledDistribution(namedtuple('InstalledDistribution', [
+        'name', 'version', 'location', 'metadata',
+])):
+    """
+    An installed distribution's `name`, `version`, `location` (the
+    ``sys.path`` entry containing it) and `metadata` directory or file path
+    """
+
+    @property
+    def key(self):
+        return normalize(self.name)
+
+    @property
+    def project_name(self):
+        """
+        The name like in :attr:`pkg_resources.Distribution.project_name`
+        """
+        return re.sub('[^A-Za-z0-9.]+', '-', self.name)
+
+    def pkg_resources_distribution(self):
+        """
+        Get the matching :class:`pkg_resources.Distribution` instance
+        """
+        import pkg_resources
+
+        if os.path.basename(self.metadata) == 'EGG-INFO':
+            return pkg_resources.Distribution.from_filename(
+                self.location, metadata=pkg_resources.PathMetadata(
+                    self.location, self.metadata))
+
+        for dist in pkg_resources.distributions_from_metadata(self.metadata):
+            return dist
+
+    def __getattr__(self, name):
+        """
+        Fall back to attributes of the :meth:`.pkg_resources_distribution`,
+        like ``requires()``, ``parsed_version`` or ``egg_info``
+
+        Keeps instances usable where :class:`pkg_resources.Distribution`
+        instances were returned before, while only importing
+        ``pkg_resources`` if such attributes are actually used
+        """
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        try:
+            dist = self.__dict__['_pkg_resources_distribution']
+        except KeyError:
+            dist = self.__dict__['_pkg_resources_distribution'] \
+                = self.pkg_resources_distribution()
+        if dist is None:
+            raise AttributeError(
+                "%s has no attribute %s" % (repr(self), repr(name)))
+
+        return getattr(dist, name)
+
+
+def _read_version(path):
+    """
+    Read the ``Version:`` header from metadata directory or file in `path`
+    """
+    if os.path.isdir(path):
+        for fname in ['METADATA', 'PKG-INFO']:
+            if os.path.isfile(os.path.join(path, fname)):
+                path = os.path.join(path, fname)
+                break
+        else:
+            return None
+
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith('Version:'):
+                    return line.split(':', 1)[1].strip()
+                if not line.strip():  # ==> end of headers
+                    break
+    except (IOError, OSError):
+        pass
+    return None
+
+
+def _parse_metadata_name(location, fname):
+    """
+    Get an :class:`InstalledDistribution` from metadata entry `fname`
+    in ``sys.path`` entry `location` or ``None`` if not a metadata entry
+    """
+    base, ext = os.path.splitext(fname)
+    if ext not in ('.dist-info', '.egg-info', '.egg'):
+        return None
+
+    path = os.path.join(location, fname)
+    if ext == '.egg':
+        if not os.path.isdir(os.path.join(path, 'EGG-INFO')):
+            return None
+        metadata = os.path.join(path, 'EGG-INFO')
+        # eggs are sys.path entries on their own
+        location = path
+    else:
+        metadata = path
+    # metadata names are like name-version[-pyX.Y[-platform]]
+    # with any - in name or version escaped as _
+    parts = base.split('-')
+    name = parts[0]
+    version = parts[1] if len(parts) > 1 else _read_version(metadata)
+    return InstalledDistribution(name, version, location, metadata)
+
+
+class DistributionIndex(dict):
+    """
+    Installed distributions by normalized names
+
+    Like for imports, the first distribution found in ``sys.path`` order
+    wins
+    """
+
+    def __init__(self, paths=None):
+        """
+        Scan given `paths` or ``sys.path``
+        """
+        super(DistributionIndex, self).__init__()
+        self.paths = list(sys.path if paths is None else paths)
+        for location in self.paths:
+            self.scan(location)
+
+    @staticmethod
+    def _distributions(location, key=None):
+        """
+        Generate all distributions from ``sys.path`` entry `location`
+
+        Optionally only those with normalized name `key`
+        """
+        location = location or '.'
+        if location.endswith('.egg'):
+            if os.path.isdir(location):
+                location, fname = os.path.split(location)
+                dist = _parse_metadata_name(location, fname)
+                if dist is not None and key in (None, dist.key):
+                    yield dist
+            return
+
+        try:
+            fnames = os.listdir(location)
+        except OSError:
+            return
+
+        for fname in sorted(fnames):
+            if fname.endswith('.egg'):
+                # only active if being a sys.path entry on its own
+                continue
+            if key is not None and normalize(
+                    os.path.splitext(fname)[0].split('-', 1)[0]) != key:
+                continue
+            dist = _parse_metadata_name(location, fname)
+            if dist is not None:
+                yield dist
+
+    def scan(self, location):
+        """
+        Add all distributions from ``sys.path`` entry `location` which are
+        not in the index yet
+        """
+        for dist in self._distributions(location):
+            self.setdefault(dist.key, dist)
+
+    def refresh(self, name):
+        """
+        Rescan all indexed paths for distribution `name` only, like after
+        (un)installing it
+
+        Returns the new entry or ``None`` if not installed anymore
+        """
+        key = normalize(name)
+        dict.pop(self, key, None)
+        for location in self.paths:
+            for dist in self._distributions(location, key):
+                dict.__setitem__(self, key, dist)
+                return dist
+
+        return None
+
+    def find(self, name):
+        """
+        Get the entry for distribution `name`, with a targeted
+        :meth:`.refresh` if not indexed, or ``None`` if not installed
+        """
+        return self.get(name) or self.refresh(name)
+
+    def update(self):
+        """
+        Scan all ``sys.path`` entries added since the last scan
+        """
+        for location in sys.path:
+            if location not in self.paths:
+                self.paths.append(location)
+                self.scan(location)
+
+    def __getitem__(self, name):
+        return super(DistributionIndex, self).__getitem__(normalize(name))
+
+    def __contains__(self, name):
+        return super(DistributionIndex, self).__contains__(normalize(name))
+
+    def get(self, name, default=None):
+        return super(DistributionIndex, self).get(normalize(name), default)
+
+
+_INDEX = None
+
+
+def distribution_index(refresh=False):
+    """
+    Get the process-wide :class:`DistributionIndex`
+
+    It is built on first call or if `refresh` is set
+    """
+    global _INDEX
+    if _INDEX is None or refresh:
+        _INDEX = DistributionIndex()
+    return _INDEX
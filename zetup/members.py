@@ -0,0 +1,97 @@
+# ZETUP
+#
+# Zimmermann's Extensible Tools for Unified Project setups
+#
+# Copyright (C) 2014-2017 Stefan Zimmermann <user@zimmermann.co>
+#
+# ZETUP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ZETUP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with ZETUP. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Index of class members defined in :class:`zetup.classpackage` member modules
+
+Finds the ``@Class.member`` decorated definitions by parsing the member
+module sources, without importing them, and caches the results by source
+file signatures
+"""
+
+import os
+import ast
+
+from .cache import Cache
+
+__all__ = ['scan_members', 'member_index']
+
+
+#: Persistent cache of member names by member module source path
+MEMBER_CACHE = Cache('members', disable_env='ZETUP_NO_MEMBER_CACHE')
+
+
+def _is_member_decorator(node, classname):
+    """
+    Check if decorator expression `node` is ``<classname>.member``
+    """
+    return isinstance(node, ast.Attribute) and node.attr == 'member' \
+        and isinstance(node.value, ast.Name) and node.value.id == classname
+
+
+def scan_members(path, classname):
+    """
+    Get the names of all top-level definitions decorated with
+    ``@<classname>.member`` in Python source file `path`
+
+    Returns ``None`` if `path` can't be read or parsed
+    """
+    key = '%s:%s' % (os.path.realpath(path), classname)
+    names = MEMBER_CACHE.load(key)
+    if names is not None:
+        return names
+
+    try:
+        with open(path, 'rb') as f:
+            tree = ast.parse(f.read(), path)
+    except (IOError, OSError, SyntaxError, ValueError):
+        return None
+
+    names = [
+        node.name for node in tree.body
+        if hasattr(node, 'decorator_list') and any(
+            _is_member_decorator(decorator, classname)
+            for decorator in node.decorator_list)
+    ]
+    MEMBER_CACHE.store(key, names, [path])
+    return names
+
+
+def member_index(pkgdir, classname, membermodules):
+    """
+    Map member names of class `classname` to the names of the
+    `membermodules` defining them, which are sub-modules of the class
+    package in directory `pkgdir`
+
+    Returns a tuple of that dictionary and a list of the member modules
+    whose sources couldn't be scanned
+    """
+    index = {}
+    unindexed = []
+    for modname in membermodules:
+        path = os.path.join(pkgdir, '%s.py' % modname)
+        if not os.path.isfile(path):
+            path = os.path.join(pkgdir, modname, '__init__.py')
+        names = scan_members(path, classname)
+        if names is None:
+            unindexed.append(modname)
+            continue
+
+        index.update(dict.fromkeys(names, modname))
+    return index, unindexed
@@ -35,12 +35,15 @@ from importlib import import_module
 from inspect import ismodule
 from types import ModuleType
 from itertools import chain
+from collections import OrderedDict
 
 import zetup
 from .object import object, meta
-from .annotate import annotate, annotate_extra
 from .doc import AutoDocScopeModule
 
+#: Default for cache validation lookups, never being an API member
+_MISSING = object()
+
 
 class deprecated(str):
     """
@@ -52,6 +55,108 @@ class deprecated(str):
         return "deprecated(%s)" % str.__repr__(self)
 
 
+def _api(mod, __all__=None, aliases=None, deprecated_aliases=None):
+    """
+    Get the API and the lazy API members of package module `mod`.
+
+    Takes the API definition arguments of :class:`zetup.package` and
+    returns a dictionary of API member names and aliases, mapped to the
+    aliased names, and a dictionary of lazy API member names, mapped to the
+    names of the sub-modules defining them
+    """
+    lazy = {}
+    if isinstance(__all__, dict):
+        for submodname, members in __all__.items():
+            if submodname is not None:
+                lazy.update(dict.fromkeys(members, submodname))
+        __all__ = list(chain(*__all__.values()))
+        # remove implicitly added sub-module attributes,
+        # which would shadow lazy API members of the same name
+        for member in lazy:
+            value = mod.__dict__.get(member)
+            if ismodule(value) \
+                    and value.__name__ == '%s.%s' % (mod.__name__, member):
+                delattr(mod, member)
+    api = dict.fromkeys(__all__) if __all__ is not None else {}
+    if aliases is not None:
+        api.update(aliases)
+    if deprecated_aliases is not None:
+        api.update((deprecated(alias), name)
+                   for alias, name in dict(deprecated_aliases).items())
+    return api, lazy
+
+
+def _native_package(
+        name, __all__=None, aliases=None, deprecated_aliases=None,
+        __getitem__=None, __iter__=None, __call__=None, native=False
+):
+    """
+    Add the dynamic API of :class:`zetup.package` to the original package
+    module given by `name` via PEP 562 module-level ``__getattr__`` and
+    ``__dir__`` functions.
+
+    Takes the same arguments as :class:`zetup.package`. Only does anything
+    if `native` is set and none of the `__getitem__`, `__iter__`, and
+    `__call__` features are requested, which need a wrapper. Returns the
+    original module in that case, otherwise ``None``
+    """
+    if not native or sys.version_info < (3, 7) \
+            or any(func is not None for func in (__getitem__, __iter__,
+                                                 __call__)):
+        return None
+
+    mod = sys.modules[name]
+    api, lazy = _api(mod, __all__, aliases, deprecated_aliases)
+    names = [member for member in api if not isinstance(member, deprecated)]
+    deprecated_names = frozenset(set(api).difference(names))
+
+    def __getattr__(member):
+        if member.startswith('__'):
+            raise AttributeError("module %s has no attribute %s"
+                                 % (repr(name), repr(member)))
+
+        # aliases are not stored to reflect changes of the aliased members
+        realname = api.get(member)
+        if realname is not None:
+            if member in deprecated_names:
+                warn("%s.%s is deprecated in favor of %s.%s"
+                     % (name, member, name, realname), DeprecationWarning)
+            return getattr(mod, realname)
+
+        submodname = lazy.get(member)
+        if submodname is not None:  # ==> lazy API member
+            obj = getattr(import_module('%s.%s' % (name, submodname)), member)
+        else:  # ==> try to find a matching submodule
+            try:
+                obj = import_module('%s.%s' % (name, member))
+            except ImportError:
+                raise AttributeError("module %s has no attribute %s"
+                                     % (repr(name), repr(member)))
+
+            from .classpackage import classpackage
+            if not isinstance(obj, classpackage):
+                return obj
+
+            obj = getattr(obj, member)
+        # store in module for native access next time
+        setattr(mod, member, obj)
+        return obj
+
+    def __dir__():
+        return sorted(set(chain((
+            member for member, value in vars(mod).items()
+            if not ismodule(value) or isinstance(value, package)
+            or value.__name__ != '%s.%s' % (name, member)
+        ), names)))
+
+    mod.__getattr__ = __getattr__
+    mod.__dir__ = __dir__
+    mod.__all__ = list(chain(getattr(mod, '__all__', ()), (
+        member for member in names
+        if member not in getattr(mod, '__all__', ()))))
+    return mod
+
+
 class package(ModuleType, object):
     """
     Package module object wrapper.
@@ -60,10 +165,21 @@ class package(ModuleType, object):
     """
     __module__ = __package__
 
+    def __new__(cls, *args, **kwargs):
+        """
+        Create the wrapper or return the original module in `native` mode.
+        """
+        if cls is package:
+            mod = _native_package(*args, **kwargs)
+            if mod is not None:
+                return mod
+
+        return ModuleType.__new__(cls)
+
     def __init__(
             self, name, __all__=None,
             aliases=None, deprecated_aliases=None,
-            __getitem__=None, __iter__=None, __call__=None
+            __getitem__=None, __iter__=None, __call__=None, native=False
     ):
         """
         Wraps a package module given by `name`.
@@ -71,7 +187,11 @@ class package(ModuleType, object):
         Original package module object is replaced in ``sys.modules`` and
         stored in :attr:``.__module__``
 
-        Optional `__all__` list defines the package API
+        Optional `__all__` list defines the package API. It can also be a
+        dictionary mapping sub-module names to lists of API member names,
+        which are then lazily imported from those sub-modules on first
+        access. API members defined in the package module itself are listed
+        under the ``None`` key
 
         Optional `aliases` and `deprecated_aliases` map alternative names to
         API names
@@ -79,73 +199,110 @@ class package(ModuleType, object):
         `__getitem__`, `__iter__`, and `__call__` features can be added to the
         package wrapper by providing handler functions or other callable
         objects (which are not called with a ``self`` argument)
+
+        If `native` is set on Python 3.7+, and none of those features are
+        requested, the original package module is not wrapped at all, but
+        gets PEP 562 module-level ``__getattr__`` and ``__dir__`` functions
+        for the dynamic API instead, and is returned as is. Attribute access
+        is then as fast as for any other module
         """
         mod = sys.modules[name]
         ModuleType.__init__(self, name, mod.__doc__)
         self.__name__ = name
         self.__module__ = mod
         sys.modules[name] = self
-        self.__dict__['__all__'] = api \
-            = dict.fromkeys(__all__) if __all__ is not None else {}
-        if aliases is not None:
-            api.update(aliases)
-        if deprecated_aliases is not None:
-            api.update((deprecated(alias), name)
-                       for alias, name in dict(deprecated_aliases).items())
+        self.__dict__['__cache__'] = {}
+        self.__dict__['__names__'] = {}
+        self.__dict__['__all__'], self.__dict__['__lazy__'] = _api(
+            mod, __all__, aliases, deprecated_aliases)
         # if api is not None:
         #     for submodname, members in dict(__all__).items():
         #         self.__dict__['__all__'].update(
         #             (name, submodname) for name in members)
-        cls = type(self)
-        cls.__getitem__.funcs[self] = __getitem__
-        cls.__iter__.funcs[self] = __iter__
-        cls.__call__.funcs[self] = __call__
+
+        # the handlers are stored in the instance, which also makes them
+        # directly accessible as wrapper.__getitem__, etc.
+        for special, func in [
+                ('__getitem__', __getitem__),
+                ('__iter__', __iter__),
+                ('__call__', __call__),
+        ]:
+            if func is not None:
+                self.__dict__[special] = func
 
     def __getitem__(self, key):
-        cls = type(self)
-        func = cls.__getitem__.funcs.get(self)
-        if func is None:
+        try:
+            func = object.__getattribute__(self, '__dict__')['__getitem__']
+        except KeyError:
             raise TypeError(
                 "%s is not subscriptable. "
                 "Instantiate %s with __getitem__=<func> to change that."
-                % (repr(self), repr(cls)))
+                % (repr(self), repr(type(self))))
         return func(key)
 
-    __getitem__.funcs = {}
-
     def __iter__(self):
-        cls = type(self)
-        func = cls.__iter__.funcs.get(self)
-        if func is None:
+        try:
+            func = object.__getattribute__(self, '__dict__')['__iter__']
+        except KeyError:
             raise TypeError(
                 "%s is not iterable. "
                 "Instantiate %s with __iter__=<func> to change that."
-                % (repr(self), repr(cls)))
+                % (repr(self), repr(type(self))))
         return func()
 
-    __iter__.funcs = {}
-
     def __call__(self, *args, **kwargs):
-        cls = type(self)
-        func = cls.__call__.funcs.get(self)
-        if func is None:
+        try:
+            func = object.__getattribute__(self, '__dict__')['__call__']
+        except KeyError:
             raise TypeError(
                 "%s is not callable. "
                 "Instantiate %s with __call__=<func> to change that."
-                % (repr(self), repr(cls)))
+                % (repr(self), repr(type(self))))
         return func(*args, **kwargs)
 
-    __call__.funcs = {}
-
     @property
     def __all__(self):
         """
         Get API names list (without deprecated aliases).
+
+        Names from the wrapped module's ``__all__`` come first, followed by
+        the other API names in order of definition
+        """
+        return list(package._api_names(self))
+
+    def _api_names(self):
+        """
+        Get the cached tuple of :attr:`.__all__` names.
+
+        It is recomputed if the wrapped module's ``__all__`` or the API
+        definition changed in size
+        """
+        api = self.__dict__['__all__']
+        modall = getattr(self.__module__, '__all__', ())
+        cache = self.__dict__['__names__']
+        try:
+            source, size, names = cache['all']
+        except KeyError:
+            pass
+        else:
+            if source is modall and size == (len(modall), len(api)):
+                return names
+
+        names = tuple(OrderedDict.fromkeys(chain(modall, (
+            name for name in api if not isinstance(name, deprecated)))))
+        cache['all'] = (modall, (len(modall), len(api)), names)
+        return names
+
+    def __refresh__(self):
+        """
+        Clear the caches of resolved API members and of API names.
+
+        Only needed after replacing members of the wrapped module which were
+        before resolved from the wrapper itself or from sub-modules, or after
+        in-place changes of the API definition
         """
-        return list(set(chain(
-            getattr(self.__module__, '__all__', ()),
-            (name for name in self.__dict__['__all__']
-             if not isinstance(name, deprecated)))))
+        self.__dict__['__cache__'].clear()
+        self.__dict__['__names__'].clear()
 
     def __setattr__(self, name, value):
         """
@@ -162,10 +319,21 @@ class package(ModuleType, object):
         if isinstance(value, classpackage):
             value = getattr(value, name)
         object.__setattr__(self, name, value)
+        self.__dict__.get('__cache__', {}).pop(name, None)
+        self.__dict__.get('__names__', {}).pop('dir', None)
+
+    def __delattr__(self, name):
+        object.__delattr__(self, name)
+        self.__dict__['__cache__'].pop(name, None)
+        self.__dict__['__names__'].pop('dir', None)
 
     def __getattribute__(self, name):
         """
         Dynamically access API from wrapped module or import extra API.
+
+        Resolved members are cached by name together with the namespace
+        they were found in, and a cache entry is only used as long as that
+        namespace still contains the same object
         """
         if name.startswith('__'):
             try:
@@ -173,6 +341,22 @@ class package(ModuleType, object):
             except AttributeError:
                 pass
 
+        try:
+            obj, namespace, key = object.__getattribute__(
+                self, '__dict__')['__cache__'][name]
+        except KeyError:
+            pass
+        else:
+            if namespace.get(key, _MISSING) is obj:
+                return obj
+
+        return package._resolve(self, name)
+
+    def _resolve(self, name):
+        """
+        Resolve API member `name` and add it to the cache.
+        """
+        cache = self.__dict__['__cache__']
         # check if name is defined as alias
         realname = self.__dict__['__all__'].get(name)
         if realname is not None:
@@ -180,34 +364,75 @@ class package(ModuleType, object):
                 warn("%s.%s is deprecated in favor of %s.%s"
                      % (self.__name__, name, self.__name__, realname),
                      DeprecationWarning)
-            name = realname
+            key = realname
+        else:
+            key = name
 
+        mod = self.__module__
+        modvars = vars(mod)
         try:  # first try to get attr from wrapped original module
-            return getattr(self.__module__, name)
+            obj = getattr(mod, key)
         except AttributeError:
-            try: # then from wrapper module
-                obj = self.__dict__[name]
-            except KeyError:
-                if name in getattr(self.__module__, '__all__', ()):
-                    raise AttributeError(
-                        "%s has no attribute %s although listed in __all__"
-                        % (repr(self.__module__), repr(name)))
-            try: # and finally try to find a matching submodule
-                obj = import_module('%s.%s' % (self.__name__, name))
-            except ImportError as exc:
+            pass
+        else:
+            if modvars.get(key, _MISSING) is obj:
+                cache[name] = (obj, modvars, key)
+            return obj
+
+        submodname = self.__dict__['__lazy__'].get(key)
+        if submodname is not None:  # ==> lazy API member
+            obj = getattr(import_module(
+                '%s.%s' % (self.__name__, submodname)), key)
+            # store in original module for faster access next time
+            setattr(mod, key, obj)
+            cache[name] = (obj, modvars, key)
+            return obj
+
+        try:  # then from wrapper module
+            obj = self.__dict__[key]
+        except KeyError:
+            if key in getattr(mod, '__all__', ()):
+                raise AttributeError(
+                    "%s has no attribute %s although listed in __all__"
+                    % (repr(mod), repr(key)))
+            # and finally try to find a matching submodule
+            submodname = '%s.%s' % (self.__name__, key)
+            try:
+                obj = import_module(submodname)
+            except ImportError:
                 raise AttributeError("%s has no attribute %s"
-                                     % (repr(self), repr(name)))
+                                     % (repr(self), repr(key)))
+            namespace = sys.modules
+        else:
+            namespace, submodname = self.__dict__, key
 
-        if isinstance(obj, zetup.classpackage):
-            classobj = getattr(obj, name)
-            setattr(self, name, classobj)
+        from .classpackage import classpackage
+        if isinstance(obj, classpackage):
+            classobj = getattr(obj, key)
+            setattr(self, key, classobj)
+            cache[name] = (classobj, self.__dict__, key)
             return classobj
+
+        cache[name] = (obj, namespace, submodname)
         return obj
 
     def __dir__(self):
         """
         Additionally get all API member names
+
+        The sorted result is cached until attributes of the wrapper are set
+        or deleted, or the :attr:`.__all__` names change
         """
+        cache = self.__dict__['__names__']
+        api_names = package._api_names(self)
+        try:
+            source, names = cache['dir']
+        except KeyError:
+            pass
+        else:
+            if source is api_names:
+                return list(names)
+
         def exclude():
             """
             Get names of submodules implicitly added to ``__dict__``.
@@ -221,10 +446,12 @@ class package(ModuleType, object):
                 if ismodule(obj) and not isinstance(obj, package):
                     yield name
 
-        return list(chain(
+        names = sorted(set(chain(
             # (name for name in self.__module__.__dict__ if name.startswith('__')),
             set(object.__dir__(self)).difference(exclude()),
-            self.__all__))
+            api_names)))
+        cache['dir'] = (api_names, names)
+        return list(names)
 
     def __repr__(self):
         """
@@ -244,10 +471,16 @@ class toplevel(package):
     """
     __module__ = __package__
 
+    #: The attributes added by :func:`zetup.annotate`
+    ANNOTATIONS = frozenset([
+        '__version__', '__requires__', '__extras__', '__distribution__',
+        '__description__', '__packages__',
+    ])
+
     def __init__(
             self, name, __all__=None,
             aliases=None, deprecated_aliases=None,
-            check_requirements=True, check_packages=True,
+            check_requirements=True, check_packages=True, lazy=False,
             __getitem__=None, __iter__=None, __call__=None):
         """
         Wrap top-level package module given by `name` and `api` list.
@@ -256,16 +489,42 @@ class toplevel(package):
         API and special features
 
         See :func:`zetup.annotate` for details about the check options
+
+        If `lazy` is set, the zetup config is only loaded, and the checks
+        are only done, on first access of any of the :attr:`.ANNOTATIONS`
         """
         super(toplevel, self).__init__(
             name, __all__,
             aliases=aliases, deprecated_aliases=deprecated_aliases,
             __getitem__=__getitem__, __iter__=__iter__, __call__=__call__
         )
-        zfg = annotate(name, check_requirements=check_requirements,
-                       check_packages=check_packages)
-        self.__package__ = pkg = zfg.PACKAGES[name]
-        pkg.zetup_config = zfg
+
+        def annotate():
+            from .annotate import annotate
+
+            zfg = annotate(name, check_requirements=check_requirements,
+                           check_packages=check_packages)
+            self.__package__ = pkg = zfg.PACKAGES[name]
+            pkg.zetup_config = zfg
+
+        if lazy:
+            self.__dict__['__annotate__'] = annotate
+        else:
+            annotate()
+
+    def __getattr__(self, name):
+        """
+        Annotate lazily on first access of any of the :attr:`.ANNOTATIONS`
+        """
+        annotate = self.__dict__.pop('__annotate__', None)
+        if annotate is None or name not in type(self).ANNOTATIONS:
+            if annotate is not None:
+                self.__dict__['__annotate__'] = annotate
+            raise AttributeError(
+                "%s has no attribute %s" % (repr(self), repr(name)))
+
+        annotate()
+        return getattr(self, name)
 
 
 class extra_toplevel_meta(meta):
@@ -291,10 +550,13 @@ class extra_toplevel(
     """
     __module__ = __package__
 
+    #: The attributes added by :func:`zetup.annotate_extra`
+    ANNOTATIONS = frozenset(['__version__', '__requires__'])
+
     def __init__(
             self, toplevel, name, __all__=None,
             aliases=None, deprecated_aliases=None,
-            check_requirements=True,
+            check_requirements=True, lazy=False,
             __getitem__=None, __iter__=None, __call__=None
     ):
         """
@@ -304,6 +566,9 @@ class extra_toplevel(
         API and special features
 
         See :func:`zetup.annotate_extra` for details about the check option
+
+        If `lazy` is set, annotation and check are only done on first access
+        of any of the :attr:`.ANNOTATIONS`
         """
         super(extra_toplevel, self).__init__(
             name, __all__,
@@ -311,5 +576,17 @@ class extra_toplevel(
             __getitem__=__getitem__, __iter__=__iter__, __call__=__call__
         )
         extra = type(self).extra
-        annotate_extra[extra](
-            toplevel, name, check_requirements=check_requirements)
+
+        def annotate():
+            from .annotate import annotate_extra
+
+            annotate_extra[extra](
+                toplevel, name, check_requirements=check_requirements)
+
+        if lazy:
+            self.__dict__['__annotate__'] = annotate
+        else:
+            annotate()
+
+    # (taken as plain function to also work in PY2)
+    __getattr__ = toplevel.__dict__['__getattr__']
@@ -19,16 +19,18 @@
 
 __all__ = ['Notebook']
 
-# TODO: not working because module is imported
-# before main zetup module is annotated
-#
-# import zetup
-#
-# __requires__ = zetup.__requires__ + zetup.__extras__['notebook']
-
+import sys
 import re
 from inspect import getmembers
 
+from zetup.modules import extra_toplevel
+
+# annotated lazily, because this module is also needed
+# for loading zetup's own config
+extra_toplevel(sys.modules['zetup'], __name__, [
+    'Notebook',
+], check_requirements=False, lazy=True)
+
 try:
     #TODO: zetup.Path base
     from path import Path as base
@@ -25,6 +25,11 @@ from textwrap import dedent
 if sys.version_info[0] == 3:
     unicode = str
 
+try:
+    from os import scandir
+except ImportError:  # PY<3.5
+    scandir = None
+
 from .error import ZetupError
 
 
@@ -42,6 +47,70 @@ class ZetupPackageCheckError(ZetupPackageError):
         self.extra = list(extra)
 
 
+class ScanCache(object):
+    """Cached results of package path lookups and directory scans.
+
+    Shared by all :class:`zetup.package.Package` instances
+    of a :class:`zetup.package.Packages` definition
+    """
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Forget all results, like after changes in the package trees.
+        """
+        self.paths = {}
+        self.dirs = {}
+        self.globs = {}
+
+    def entries(self, path):
+        """Get sorted lists of the file names and of the directory names
+           in `path` from a single directory scan.
+
+        Both are empty if `path` is not a readable directory
+        """
+        try:
+            return self.dirs[path]
+        except KeyError:
+            pass
+
+        files, dirs = [], []
+        try:
+            if scandir is not None:
+                # the DirEntry objects already know their types
+                for entry in list(scandir(path)):
+                    if entry.is_dir():
+                        dirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
+            else:
+                for name in os.listdir(path):
+                    if os.path.isdir(os.path.join(path, name)):
+                        dirs.append(name)
+                    elif os.path.isfile(os.path.join(path, name)):
+                        files.append(name)
+        except OSError:
+            pass
+        result = self.dirs[path] = (sorted(files), sorted(dirs))
+        return result
+
+    def glob(self, path, pattern):
+        """Get the relative paths of all files and directories in `path`
+           matching the ``glob`` `pattern`.
+
+        Uses :func:`glob.glob` for each combination only once
+        """
+        try:
+            return self.globs[path, pattern]
+        except KeyError:
+            pass
+
+        result = self.globs[path, pattern] = [
+            os.path.relpath(match, path)
+            for match in glob(os.path.join(path, pattern))]
+        return result
+
+
 class File(str):
     """The name of a package file (source or data)
        with reference to the package and its absolute path.
@@ -81,9 +150,10 @@ class Package(str):
 
     def __init__(self, pkg, root=None, path=None, data=None,
                  sources=None, datafiles=None, subpackages=None,
-                 zfg=None):
+                 zfg=None, scan=None):
         if not isinstance(pkg, Package):
             pkg = None
+        self.scan = scan or pkg and pkg.scan or ScanCache()
         self.root = root or pkg and pkg.root
         self._path = path or pkg and pkg._path
         self.data = data and [os.path.sep.join(d.split('/')) for d in data] \
@@ -95,14 +165,23 @@ class Package(str):
         if not subpackages and pkg:
             subpackages = pkg._subpackages
         self._subpackages = subpackages and [
-          type(self)(spkg, root=self.root) for spkg in subpackages
+          type(self)(spkg, root=self.root, scan=self.scan)
+          for spkg in subpackages
           ] or None
         self.zfg = zfg or pkg and pkg.zfg
 
     @property
     def path(self):
         """The absolute path of the package.
+
+        Cached in the shared :class:`zetup.package.ScanCache`
         """
+        key = (self.root, self._path, str(self))
+        try:
+            return self.scan.paths[key]
+        except KeyError:
+            pass
+
         if not os.path.exists(self.root):
             raise RuntimeError(
                 "Given root directory for package %s does not exist: %s"
@@ -118,8 +197,9 @@ class Package(str):
                 "Given root path for package %s is not a directory: %s"
                 % (repr(str(self)), self.root))
 
-        return os.path.realpath(os.path.join(self.root or '.',
-          self._path or os.path.join(*self.split('.'))))
+        path = self.scan.paths[key] = os.path.realpath(os.path.join(
+          self.root or '.', self._path or os.path.join(*self.split('.'))))
+        return path
 
     def sources(self, force_search=False):
         """Iterates :class:`zetup.package.Source` instances
@@ -131,9 +211,9 @@ class Package(str):
                 yield source
             return
 
-        for name in os.listdir(self.path):
-            path = os.path.join(self.path, name)
-            if os.path.isfile(path) and path.endswith('.py'):
+        files, _ = self.scan.entries(self.path)
+        for name in files:
+            if name.endswith('.py'):
                 yield Source(name, package=self)
 
     def datafiles(self, force_search=False):
@@ -148,9 +228,8 @@ class Package(str):
         if not self.data:
             return
         for pattern in self.data:
-            for path in glob(os.path.join(self.path, pattern)):
-                yield DataFile(os.path.relpath(path, self.path),
-                               package=self)
+            for relpath in self.scan.glob(self.path, pattern):
+                yield DataFile(relpath, package=self)
 
     def files(self, force_search=False):
         """Iterates the package's direct sources and data files combined
@@ -170,13 +249,14 @@ class Package(str):
                 yield pkg
             return
 
-        for name in os.listdir(self.path):
-            path = os.path.join(self.path, name)
-            if os.path.isdir(path) and os.path.isfile(
-              os.path.join(path, '__init__.py')):
+        path = self.path
+        _, dirs = self.scan.entries(path)
+        for name in dirs:
+            files, _ = self.scan.entries(os.path.join(path, name))
+            if '__init__.py' in files:
                 yield type(self)('.'.join((self, name)),
                   path=self._path and os.path.join(self._path, name),
-                  root=self.root)
+                  root=self.root, scan=self.scan)
 
     def walk(self):
         """Iterates the package's sub-packages recursively.
@@ -266,9 +346,33 @@ class Package(str):
                   ",\n    ".join(repr(os.path.basename(src)) for src in self.sources()),
                   ",\n    ".join(pkg.py for pkg in self.subpackages()))
 
+    @property
+    def snapshot(self):
+        """Get JSON-serializable package definition for zetup config snapshots.
+        """
+        return {
+            'name': str(self),
+            'path': self._path,
+            'data': self.data and [d.replace(os.path.sep, '/')
+                                   for d in self.data],
+            'sources': [os.path.basename(src) for src in self.sources()],
+            'subpackages': [pkg.snapshot for pkg in self.subpackages()],
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot, root=None, scan=None):
+        """Create instance from `snapshot` as returned by :attr:`.snapshot`.
+        """
+        scan = scan or ScanCache()
+        return cls(snapshot['name'], root=root, path=snapshot['path'],
+                   data=snapshot['data'], sources=snapshot['sources'],
+                   subpackages=[cls.from_snapshot(pkg, root=root, scan=scan)
+                                for pkg in snapshot['subpackages']],
+                   scan=scan)
+
 
 class Packages(object):
-    def _parse(self, text, root=None):
+    def _parse(self, text, root=None, scan=None):
         packages = []
         for line in map(str.strip, text.split('\n')):
             if not line:
@@ -283,7 +387,8 @@ class Packages(object):
                 pkg, path = map(str.strip, pkg.split(':'))
             except ValueError:
                 path = None
-            packages.append(Package(pkg, root=root, path=path, data=data))
+            packages.append(Package(pkg, root=root, path=path, data=data,
+                                    scan=scan))
         toplevel = list(packages)
         for pkg in sorted(packages):
             for item in packages:
@@ -299,10 +404,13 @@ class Packages(object):
     def __init__(self, text_or_toplevel, root=None, zfg=None):
         self.root = root
         self.zfg = zfg
+        #: Shared by all packages
+        self.scan = ScanCache()
         if isinstance(text_or_toplevel, (str, unicode)):
-            self.toplevel = self._parse(text_or_toplevel, root=root)
+            self.toplevel = self._parse(
+                text_or_toplevel, root=root, scan=self.scan)
         else:
-            self.toplevel = [Package(pkg, root=root)
+            self.toplevel = [Package(pkg, root=root, scan=self.scan)
                              for pkg in text_or_toplevel]
 
     def __iter__(self):
@@ -371,5 +479,21 @@ class Packages(object):
           ",\n  ".join(pkg.py for pkg in self.toplevel),
           root_code)
 
+    @property
+    def snapshot(self):
+        """Get JSON-serializable toplevel package definitions
+           for zetup config snapshots.
+        """
+        return [pkg.snapshot for pkg in self.toplevel]
+
+    @classmethod
+    def from_snapshot(cls, snapshot, root=None, zfg=None):
+        """Create instance from `snapshot` as returned by :attr:`.snapshot`.
+        """
+        self = cls([], root=root, zfg=zfg)
+        self.toplevel = [Package.from_snapshot(pkg, root=root, scan=self.scan)
+                         for pkg in snapshot]
+        return self
+
     def __repr__(self):
         return "%s(%s)" % (type(self).__name__, repr(self.toplevel))
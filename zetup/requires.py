@@ -17,24 +17,123 @@
 # You should have received a copy of the GNU Lesser General Public License
 # along with zetup.py. If not, see <http://www.gnu.org/licenses/>.
 
-__all__ = ['Requirements', 'DistributionNotFound', 'VersionConflict']
+__all__ = [
+    'Requirements', 'DistributionNotFound', 'VersionConflict',
+    'RequirementsNotSatisfied']
 
 import sys
 if sys.version_info[0] == 3:
     unicode = str
+import os
 import re
+import json
+from hashlib import sha1
+from importlib import import_module
+from collections import OrderedDict
+from itertools import chain
 
-import pkg_resources
-from pkg_resources import \
-    parse_requirements, Requirement, get_distribution
+from .error import ZetupError
+from .installed import distribution_index, normalize
+from .cache import Cache, stat_signature
+
+try:
+    from packaging.requirements import Requirement as _Requirement
+except ImportError:  # no standalone packaging
+    from pkg_resources import Requirement
+else:
+    class Requirement(_Requirement):
+        """A :class:`packaging.requirements.Requirement`
+           with the additional attributes of
+           :class:`pkg_resources.Requirement` used by zetup,
+           but without the slow import of :mod:`pkg_resources`.
+        """
+        def __init__(self, requirement_string):
+            super(Requirement, self).__init__(requirement_string)
+            self.unsafe_name = self.name
+            self.project_name = re.sub('[^A-Za-z0-9.]+', '-', self.name)
+            self.key = self.project_name.lower()
+            self.specs = [
+                (spec.operator, spec.version) for spec in self.specifier]
+            self.extras = tuple(sorted(self.extras))
+
+        @staticmethod
+        def parse(s):
+            return Requirement(s)
+
+        def __contains__(self, version):
+            return self.specifier.contains(str(version), prereleases=True)
+
+try:
+    from importlib.util import find_spec
+except ImportError:  # PY2
+    from imp import find_module
+
+    def find_spec(name):
+        try:
+            return find_module(name)
+        except ImportError:
+            return None
+
+
+def _module_exists(name):
+    """Check if module `name` can be found without importing it.
+
+    - Parent packages of dotted names need to be imported for that,
+      but only if the top-level package can be found at all.
+    """
+    try:
+        if '.' in name and find_spec(name.split('.', 1)[0]) is None:
+            return False
+        return find_spec(name) is not None
+    except ImportError:
+        return False
+
+
+#: Subclasses of zetup's requirement exceptions,
+#: which are also derived from the pkg_resources exceptions of same name
+_PKG_RESOURCES_COMPATIBLE = {}
+
+
+def _pkg_resources_compatible(cls):
+    """Get the subclass of zetup exception `cls`, which is also derived from
+       the :mod:`pkg_resources` exception of the same name.
+
+    - Only if :mod:`pkg_resources` is already imported, otherwise returns
+      `cls` itself. Keeps ``except pkg_resources.VersionConflict``, etc.
+      working without importing :mod:`pkg_resources` just for that.
+    """
+    pkg_resources = sys.modules.get('pkg_resources')
+    if pkg_resources is None:
+        return cls
+
+    try:
+        return _PKG_RESOURCES_COMPATIBLE[cls]
+    except KeyError:
+        compatible = _PKG_RESOURCES_COMPATIBLE[cls] = type(
+            cls.__name__, (cls, getattr(pkg_resources, cls.__name__)), {
+                '__module__': cls.__module__,
+            })
+        return compatible
 
 
-class DistributionNotFound(pkg_resources.DistributionNotFound):
+class DistributionNotFound(ZetupError):
+    """A required distribution is not installed.
+
+    - Also an instance of :exc:`pkg_resources.DistributionNotFound`
+      if :mod:`pkg_resources` was imported before raising.
+    """
+    def __new__(cls, *args, **kwargs):
+        return ZetupError.__new__(_pkg_resources_compatible(cls))
+
     def __init__(self, req, requirer, reason=None):
         super(DistributionNotFound, self).__init__(req, [requirer])
         self.requirer = requirer
         self.reason = reason
 
+    # like in pkg_resources.DistributionNotFound
+    req = property(lambda self: self.args[0])
+    requirers = property(lambda self: self.args[1])
+
     def __str__(self):
         text = "%s needs %s" % (self.requirer, self.req)
         if self.reason:
@@ -42,13 +141,25 @@ class DistributionNotFound(pkg_resources.DistributionNotFound):
         return text
 
 
-class VersionConflict(pkg_resources.VersionConflict):
+class VersionConflict(ZetupError):
+    """An installed distribution doesn't match a requirement.
+
+    - Also an instance of :exc:`pkg_resources.VersionConflict`
+      if :mod:`pkg_resources` was imported before raising.
+    """
+    def __new__(cls, *args, **kwargs):
+        return ZetupError.__new__(_pkg_resources_compatible(cls))
+
     def __init__(self, req, found_version, requirer, reason=None):
-        super(VersionConflict, self).__init__(
-          '%s-%s' % (req.key, found_version), req)
+        dist = '%s-%s' % (req.key, found_version)
+        super(VersionConflict, self).__init__(dist, req)
         self.requirer = requirer
         self.reason = reason
 
+    # like in pkg_resources.VersionConflict
+    dist = property(lambda self: self.args[0])
+    req = property(lambda self: self.args[1])
+
     def __str__(self):
         text = "%s needs %s but found %s" % (
           self.requirer, self.req, self.dist)
@@ -57,9 +168,84 @@ class VersionConflict(pkg_resources.VersionConflict):
         return text
 
 
+#: Persistent cache of successful requirement checks,
+#: only keeping the most recent ones of different environments
+CHECK_CACHE = Cache(
+    'check', disable_env='ZETUP_NO_CHECK_CACHE', max_entries=64)
+
+
+def _sys_path_hash():
+    """Get a hash of all ``sys.path`` entries and their stat signatures.
+    """
+    return sha1(json.dumps([
+        [path, stat_signature(path or '.')] for path in sys.path
+    ]).encode('utf-8')).hexdigest()
+
+
+class RequirementsNotSatisfied(ZetupError):
+    """All :exc:`DistributionNotFound` and :exc:`VersionConflict` failures
+       from a :meth:`Requirements.check` in ``'metadata'`` mode.
+    """
+    def __init__(self, failures, requirer=None):
+        self.failures = list(failures)
+        self.requirer = requirer
+        super(RequirementsNotSatisfied, self).__init__(str(self))
+
+    def __str__(self):
+        return "%s has %d unsatisfied requirement(s):\n%s" % (
+            self.requirer, len(self.failures), '\n'.join(
+                "- %s" % failure for failure in self.failures))
+
+
 class Requirements(object):
     """Package requirements manager.
     """
+    #: The default mode of :meth:`.check`
+    CHECK_MODE = 'import'
+
+    #: Matches python version tags like ``#py3`` at the beginning of lines
+    PYVER_TAG = re.compile(r'#py([0-9]+) +')
+
+    @staticmethod
+    def _tokenize(text):
+        """Generate ``(pyver, spec, impname)`` tuples from `text`,
+           which should contain newline separated requirement specs,
+           in a single pass over its lines.
+
+        - `pyver` is the version from an optional #py.. tag
+          at the beginning of the line or ``None``.
+        - `impname` is from an optional "#import name" comment
+          after the requirement or ``None``.
+        - Lines ending with a backslash are continued on the next line.
+        - Skips empty and comment lines.
+        """
+        match_pyver = Requirements.PYVER_TAG.match
+        continued = ''
+        for line in text.splitlines():
+            line = line.strip()
+            if line.endswith('\\'):
+                continued += line[:-1]
+                continue
+            if continued:
+                line, continued = continued + line, ''
+            if not line:
+                continue
+            pyver = None
+            if line.startswith('#py'):
+                match = match_pyver(line)
+                if match: #==> only required in given python version
+                    pyver, line = match.group(1), line[match.end():]
+            spec, tag, impname = line.partition('#import')
+            impname = tag and impname.strip() or None
+            spec = spec.partition('#')[0].strip()
+            if not spec: # maybe a comment line
+                continue
+            yield pyver, spec, impname
+        if continued:
+            spec = continued.partition('#')[0].strip()
+            if spec:
+                yield None, spec, None
+
     @staticmethod
     def _parse(text):
         """ Generate parsed requirements from `text`,
@@ -72,44 +258,45 @@ class Requirements(object):
         - Supports #py.. tags at the beginning of lines,
           specifying a python version the requirement applies to.
         """
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            match = re.match(r'^#py([0-9]+) (.*)$', line)
-            if match: #==> only required in given python version
-                pyver, line = match.groups()
+        return Requirements._from_tokens(Requirements._tokenize(text))
+
+    @staticmethod
+    def _from_tokens(tokens):
+        """Generate parsed requirements
+           from ``(pyver, spec, impname)`` tuples.
+
+        - Skips requirements not applying to the running python version.
+        """
+        pyversion = '%s%s' % sys.version_info[:2]
+        for pyver, spec, impname in tokens:
+            if pyver is not None:
                 #TODO:
                 # if len(pyver) > 2:
-                if not ('%s%s' % sys.version_info[:2]).startswith(pyver):
+                if not pyversion.startswith(pyver):
                     continue
-            try:
-                req, impname = line.split('#import')
-            except ValueError:
-                req = next(parse_requirements(line), None)
-                impname = req and req.unsafe_name
-            else:
-                req = next(parse_requirements(req), None)
-            if not req: # maybe a comment line
-                continue
-            req.impname = impname.strip()
+            # directly instantiate instead of Requirement.parse(),
+            # which is a parse_requirements() generator for every spec
+            # in case of pkg_resources
+            req = Requirement(spec)
+            req.impname = impname or req.unsafe_name
             yield req
 
     def __init__(self, reqs, zfg=None):
-        """Store a list of :class:`pkg_resources.Requirement` instances
+        """Store a list of :class:`Requirement` instances
            from the given requirement specs
            and additionally store them newline separated
            in the :class:`str` base.
 
         :param reqs: Either a single string of requirement specs
           or a sequence of strings and/or
-          :class:`pkg_resources.Requirement` instances.
+          :class:`Requirement` instances.
         :param zfg: Optional zetup config object
           the requirements are related to.
         """
         if isinstance(reqs, Requirements):
+            # already parsed ==> no need to parse text again
             txt = reqs.txt
-            reqlist = list(self._parse(reqs.txt))
+            reqlist = list(reqs)
         elif isinstance(reqs, (str, unicode)):
             txt = reqs
             reqlist = list(self._parse(reqs))
@@ -121,14 +308,92 @@ class Requirements(object):
                     reqlist.extend(self._parse(req))
                 elif isinstance(req, Requirement):
                     reqlist.append(req)
+                elif hasattr(req, 'specifier'):
+                    # ==> requirement object from other library
+                    impname = getattr(req, 'impname', None)
+                    req = Requirement(str(req))
+                    req.impname = impname or req.unsafe_name
+                    reqlist.append(req)
                 else:
                     raise TypeError(type(req))
                 txt += '\n%s' % req
 
         self.txt = txt
-        self._list = reqlist
+        self._dict = OrderedDict()
+        #: Increased on every change, to let containers validate caches
+        self.revision = 0
+        for req in reqlist:
+            self._add(req)
         self.zfg = zfg
 
+    @property
+    def _list(self):
+        return list(self)
+
+    @staticmethod
+    def _marker(req):
+        """Get the environment marker of `req` as string or ``None``.
+        """
+        marker = getattr(req, 'marker', None)
+        return None if marker is None else str(marker)
+
+    def _add(self, req):
+        """Add parsed `req` to the index of requirements
+           by normalized project name.
+
+        - Merges with an already contained requirement
+          for the same project and the same environment marker.
+        - Requirements with different markers are kept separately,
+          since merging them would make unconditional requirements
+          conditional.
+        """
+        self.revision += 1
+        entries = self._dict.setdefault(normalize(req.key), [])
+        marker = self._marker(req)
+        for index, existing in enumerate(entries):
+            if self._marker(existing) == marker:
+                entries[index] = self._merge(existing, req)
+                return
+
+        entries.append(req)
+
+    @staticmethod
+    def _merge(req, other):
+        """Combine two parsed requirements for the same project
+           and with the same environment marker
+           into a new one with the specifiers and extras of both.
+
+        - Keeps the `impname` of `req`
+          unless only `other` has an explicit one.
+        - URL requirements can't be combined and `other` just wins.
+        """
+        if str(req) == str(other) or getattr(req, 'url', None) \
+                or getattr(other, 'url', None):
+            merged = other if getattr(other, 'url', None) else req
+        else:
+            extras = sorted(set(req.extras) | set(other.extras))
+            specs = list(req.specs)
+            specs.extend(spec for spec in other.specs if spec not in specs)
+            spec = req.project_name
+            if extras:
+                spec += '[%s]' % ','.join(extras)
+            spec += ','.join(op + version for op, version in specs)
+            marker = Requirements._marker(req)
+            if marker is not None:
+                spec += '; %s' % marker
+            merged = Requirement.parse(spec)
+        impname = getattr(req, 'impname', req.unsafe_name)
+        if impname == req.unsafe_name:
+            impname = getattr(other, 'impname', other.unsafe_name)
+            if impname == other.unsafe_name:
+                impname = req.unsafe_name
+        if getattr(merged, 'impname', None) != impname:
+            if merged is req or merged is other:
+                # don't modify instances shared with other containers
+                merged = Requirement.parse(str(merged))
+            merged.impname = impname
+        return merged
+
     def __eq__(self, other):
         return isinstance(other, Requirements) \
           and self._list == other._list
@@ -136,19 +401,74 @@ class Requirements(object):
     def __str__(self):
         return '\n'.join(map(str, self))
 
-    def check(self, raise_=True):
+    @property
+    def requirer(self):
+        """The ``name-version`` of the related zetup config's project.
+        """
+        return self.zfg and '%s-%s' % (
+          self.zfg.NAME, self.zfg.VERSION or '(none)')
+
+    def check(self, raise_=True, mode=None):
         """Check that all requirements are available (importable)
            and their versions match (using modules' __version__ attributes).
 
-        - Fallback to pkg_resources.get_distribution().version
+        - Fallback to the version from the shared
+          :func:`zetup.installed.distribution_index`
           if no __version__ or is None.
+        - In ``'metadata'`` `mode`, see :meth:`.check_metadata` instead.
+          Default `mode` is :attr:`.CHECK_MODE`.
+        - Successful checks are cached persistently per interpreter
+          and ``sys.path`` state, until any ``sys.path`` directory
+          or metadata of a required distribution changes.
+          Set ``ZETUP_NO_CHECK_CACHE`` to always check.
 
         :param raise_: Raise DistributionNotFound if ImportError
           or VersionConflict if version doesn't match?
           If False just return False in that case.
         """
-        requirer = self.zfg and '%s-%s' % (
-          self.zfg.NAME, self.zfg.VERSION or '(none)')
+        mode = mode or self.CHECK_MODE
+        if mode not in ['import', 'metadata']:
+            raise ValueError("Invalid requirements check mode: %s"
+                             % repr(mode))
+
+        key = '\n'.join([sys.executable, mode, _sys_path_hash()] + sorted(
+            '%s #import %s' % (req, req.impname) for req in self))
+        if CHECK_CACHE.load(key):
+            return True
+
+        if mode == 'metadata':
+            result = self.check_metadata(raise_=raise_)
+        else:
+            result = self.check_import(raise_=raise_)
+        if result:
+            CHECK_CACHE.store(key, True, self._check_inputs())
+        return result
+
+    def _check_inputs(self):
+        """Get the paths of all metadata files whose changes can affect
+           the result of :meth:`.check`.
+
+        - Changes of ``sys.path`` directories already lead to
+          different cache keys.
+        """
+        index = distribution_index()
+        index.update()
+        inputs = []
+        for req in self:
+            dist = index.get(req.key)
+            if dist is not None:
+                inputs.append(dist.metadata)
+                if os.path.isdir(dist.metadata):
+                    inputs += [os.path.join(dist.metadata, fname)
+                               for fname in ['METADATA', 'PKG-INFO']]
+        return inputs
+
+    def check_import(self, raise_=True):
+        """Check requirements by importing their root modules.
+
+        - The default mode of :meth:`.check`, which also caches results.
+        """
+        requirer = self.requirer
         for req in self:
             try:
                 mod = __import__(req.impname)
@@ -168,13 +488,13 @@ class Requirements(object):
                     raise AttributeError(
                       "module's '__version__' attribute is None")
             except AttributeError as e_no__version__attr:
-                try: # try to get version from distribution
-                    dist = get_distribution(req.key)
-                except pkg_resources.DistributionNotFound as e:
+                # try to get version from distribution
+                dist = distribution_index().find(req.key)
+                if dist is None:
                     if raise_:
                         raise VersionConflict(req, None, requirer,
-                          reason="%s: %s. %s: %s" % (
-                            e_no__version__attr, mod, type(e).__name__, e))
+                          reason="%s: %s. No distribution %s found" % (
+                            e_no__version__attr, mod, repr(req.key)))
                     return False
                 version = dist.version
             if version not in req:
@@ -183,42 +503,131 @@ class Requirements(object):
                 return False
         return True
 
+    def check_metadata(self, raise_=True):
+        """Check all requirements in a single pass against the metadata
+           of installed distributions, without importing any modules.
+
+        - The ``'metadata'`` mode of :meth:`.check`,
+          which also caches results.
+        - Uses the process-wide :func:`zetup.installed.distribution_index`.
+        - Skips requirements whose environment markers don't apply.
+        - Only for requirements without installed metadata,
+          falls back to looking up their root modules.
+          Those are only imported if a version must be checked.
+
+        :param raise_: Raise :exc:`RequirementsNotSatisfied`
+          with all failures if any requirements are not satisfied?
+          If False just return False in that case.
+        """
+        requirer = self.requirer
+        index = distribution_index()
+        index.update()
+        failures = []
+        for req in self:
+            marker = getattr(req, 'marker', None)
+            if marker is not None and not marker.evaluate():
+                continue
+
+            dist = index.find(req.key)
+            if dist is not None and dist.version is not None:
+                version = dist.version
+            elif not _module_exists(req.impname):
+                failures.append(DistributionNotFound(
+                    req, requirer, reason="No distribution metadata"
+                    " and no module %s found" % repr(req.impname)))
+                continue
+            elif not req.specs:  # No version constraints
+                continue
+            else:
+                version = getattr(
+                    import_module(req.impname), '__version__', None)
+                if version is None:
+                    failures.append(VersionConflict(
+                        req, None, requirer, reason="No distribution"
+                        " metadata and no %s.__version__ found"
+                        % req.impname))
+                    continue
+
+            if version not in req:
+                failures.append(VersionConflict(req, version, requirer))
+
+        if failures:
+            if raise_:
+                raise RequirementsNotSatisfied(failures, requirer)
+            return False
+
+        return True
+
     @property
     def checked(self):
         self.check()
         return self
 
     def __iter__(self):
-        return iter(self._list)
+        return chain.from_iterable(self._dict.values())
+
+    def __len__(self):
+        return sum(map(len, self._dict.values()))
+
+    def __contains__(self, name):
+        tokens = self.__dict__.get('_tokens')
+        if tokens is not None:  # ==> no need to parse snapshot yet
+            return normalize(name) in (key for _, _, key in tokens)
+
+        return normalize(name) in self._dict
 
     def __getitem__(self, name):
         """Get a requirement by its distribution name.
+
+        - If there are several requirements for that distribution
+          with different environment markers, the first one is returned.
         """
-        for req in self._list:
-            if name in [req.key, req.unsafe_name]:
-                return req
-        raise KeyError(name)
+        try:
+            return self._dict[normalize(name)][0]
+        except KeyError:
+            raise KeyError(name)
 
     def __delitem__(self, name):
-        """Delete a requirement by its distribution name.
+        """Delete all requirements for a distribution name.
         """
-        for req in list(self._list):
-            if name in [req.key, req.unsafe_name]:
-                return self._list.remove(req)
-        raise KeyError(name)
+        try:
+            del self._dict[normalize(name)]
+        except KeyError:
+            raise KeyError(name)
+        self.revision += 1
 
     def __add__(self, reqs):
         """Return a new :class:`Requirements` instance
            with additional `reqs` from string
            or another :class:`Requirements` instance.
+
+        - Requirements for the same project get merged.
+        - Only parses `reqs` if given as string.
+        """
+        result = type(self)(self, zfg=self.zfg)
+        result += reqs
+        return result
+
+    def __iadd__(self, reqs):
+        """Add `reqs` from string
+           or another :class:`Requirements` instance in-place.
+
+        - Requirements for the same project get merged.
+        - Only parses `reqs` if given as string.
         """
         if isinstance(reqs, Requirements):
-            reqs = reqs.txt
-        return type(self)('%s\n%s' % (
-            # For simplicity:
-            # Just create explicit #import hints for every requirement:
-            # '\n'.join('%s #import %s' % (req, req.impname) for req in self),
-            self.txt, reqs), zfg=self.zfg)
+            txt = reqs.txt
+            reqlist = list(reqs)
+        elif isinstance(reqs, (str, unicode)):
+            txt = reqs
+            reqlist = self._parse(reqs)
+        else:
+            return NotImplemented
+
+        self.txt = '%s\n%s' % (self.txt, txt)
+        for req in reqlist:
+            self._add(req)
+        return self
 
     @property
     def py(self):
@@ -226,5 +635,55 @@ class Requirements(object):
           type(self).__name__, self.txt) ## '\n'.join(
             ## '%s #import %s' % (req, req.impname) for req in self))
 
+    @property
+    def snapshot(self):
+        """Get the pre-tokenized requirements as JSON-serializable list
+           of ``[pyver, spec, impname, key]`` items,
+           with the normalized project names as keys.
+        """
+        return [[pyver, spec, impname, normalize(Requirement(spec).name)]
+                for pyver, spec, impname in self._tokenize(self.txt)]
+
+    @classmethod
+    def from_snapshot(cls, snapshot, zfg=None):
+        """Create instance from pre-tokenized requirements `snapshot`
+           as returned by :attr:`.snapshot`.
+
+        - The requirement specs are only parsed on first use
+          of the :class:`Requirement` objects,
+          which isn't needed for ``in`` checks and text representations.
+        """
+        self = cls([], zfg=zfg)
+        del self._dict
+        pyversion = '%s%s' % sys.version_info[:2]
+        self._tokens = [
+            (spec, impname, key) for pyver, spec, impname, key in snapshot
+            if pyver is None or pyversion.startswith(pyver)]
+        self.txt = '\n'.join(
+            ('#py%s ' % pyver if pyver else '') + spec
+            + (' #import %s' % impname if impname else '')
+            for pyver, spec, impname, _ in snapshot)
+        return self
+
+    def __getattr__(self, name):
+        """Parse the requirements of a snapshot on first use.
+
+        - See :meth:`.from_snapshot`.
+        """
+        tokens = self.__dict__.pop('_tokens', None) \
+            if name == '_dict' else None
+        if tokens is None:
+            raise AttributeError("%s has no attribute %s"
+                                 % (type(self).__name__, repr(name)))
+
+        self._dict = OrderedDict()
+        # not a change, so don't let containers invalidate their caches
+        revision = self.revision
+        for req in self._from_tokens(
+                (None, spec, impname) for spec, impname, _ in tokens):
+            self._add(req)
+        self.revision = revision
+        return self._dict
+
     def __repr__(self):
         return str(self)
@@ -21,18 +21,45 @@
 Resolver for setup requirements, fetching ``.eggs/`` on demand
 """
 
-import re
 import sys
+import os
+import json
+import threading
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+from time import time
 
 from pkg_resources import (
-    get_distribution, working_set, DistributionNotFound, VersionConflict)
+    get_distribution, working_set, Requirement,
+    DistributionNotFound, VersionConflict)
 from setuptools.dist import Distribution
 
-__all__ = ['resolve']
+from .eggcache import EggCache
+
+__all__ = ['resolve', 'ResolvePlan']
+
+
+#: Per-thread state of :func:`fetch_build_egg`
+_LOCAL = threading.local()
+
+
+def fetch_build_egg(req):
+    """
+    Fetch egg for `req` with a setuptools ``Distribution`` of its own for
+    the current thread, since ``fetch_build_egg`` is not thread-safe
+    """
+    installer = getattr(_LOCAL, 'installer', None)
+    if installer is None:
+        installer = _LOCAL.installer = Distribution().fetch_build_egg
+    return installer(req)
 
 
 #: The egg installer
-INSTALLER = Distribution().fetch_build_egg
+INSTALLER = fetch_build_egg
+
+#: The default maximum number of eggs to fetch concurrently,
+#: which can be overridden via ``ZETUP_RESOLVE_WORKERS``
+WORKERS = 4
 
 
 class StdErrWrapper(object):
@@ -59,46 +86,229 @@ class StdErrWrapper(object):
         pass
 
 
-def resolve(requirements):
+def _requirement(req):
+    """
+    Get parsed `req` without environment markers
+    """
+    return Requirement.parse(str(req).split(';')[0])
+
+
+def _install(req):
+    """
+    Fetch egg for `req` with :data:`INSTALLER` and return the distribution
+    together with the seconds it took
+    """
+    start = time()
+    dist = INSTALLER(req)
+    return dist, time() - start
+
+
+def _fetch(reqs):
+    """
+    Fetch eggs for all `reqs` with :data:`INSTALLER`, concurrently if more
+    than one worker is allowed, and return ``(dist, seconds)`` pairs in
+    same order
+    """
+    workers = min(len(reqs), int(
+        os.environ.get('ZETUP_RESOLVE_WORKERS') or WORKERS))
+    if workers < 2:
+        return [_install(req) for req in reqs]
+
+    pool = ThreadPool(workers)
+    try:
+        return pool.map(_install, reqs)
+    finally:
+        pool.close()
+        pool.join()
+
+
+class ResolvePlan(OrderedDict):
+    """
+    The result of :func:`resolve`, mapping ``name[extras]`` node names of
+    the requirement graph to JSON-serializable dictionaries with:
+
+    * ``'requirement'``: the requirement spec string
+    * ``'chain'``: the fully qualified requirement chain
+    * ``'status'``: ``'installed'``, ``'cached'`` (found in egg cache),
+      ``'fetched'``, or ``'fetch'`` (only in dry runs)
+    * ``'version'`` and ``'location'`` of the distribution (or ``None``)
+    * ``'requires'``: the node names of its requirements
+    * ``'time'``: the seconds spent in ``'lookup'`` (``get_distribution``
+      and egg cache) and in ``'fetch'``
+
+    Skipped cyclic requirement chains are stored in :attr:`.cycles`, and
+    requirement chains not satisfied by the version already planned for
+    their node in :attr:`.conflicts`
+    """
+
+    def __init__(self, dry_run=False):
+        super(ResolvePlan, self).__init__()
+        self.dry_run = dry_run
+        self.cycles = []
+        self.conflicts = []
+
+    @property
+    def time(self):
+        """
+        Get the total seconds spent in lookups and fetches
+        """
+        return sum(sum(node['time'].values()) for node in self.values())
+
+    @property
+    def report(self):
+        """
+        Get the JSON-serializable report dictionary
+        """
+        return {
+            'dry_run': self.dry_run,
+            'time': self.time,
+            'nodes': [dict(node, name=name) for name, node in self.items()],
+            'cycles': self.cycles,
+            'conflicts': self.conflicts,
+        }
+
+    @property
+    def json(self):
+        return json.dumps(self.report, indent=2, sort_keys=True)
+
+    def __str__(self):
+        """
+        Create a table of all nodes, sorted by time spent
+        """
+        nodes = sorted(self.items(), key=lambda item: -sum(
+            item[1]['time'].values()))
+        return '\n'.join(
+            "%-40s %-10s %-12s lookup %.3fs fetch %.3fs" % (
+                name, node['status'], node['version'] or '-',
+                node['time']['lookup'], node['time']['fetch'])
+            for name, node in nodes)
+
+
+def _node_name(req):
+    """
+    Get the ``name[extras]`` graph node name of `req`
+    """
+    if req.extras:
+        return '%s[%s]' % (req.key, ','.join(sorted(req.extras)))
+    return req.key
+
+
+def resolve(requirements, egg_cache=None, plan=False):
     """
     Make sure that setup `requirements` are always correctly resolved and
     accessible by:
 
-    * Recursively resolving their runtime requirements
-    * Moving any installed eggs to the front of ``sys.path``
+    * Recursively resolving their runtime requirements, each combination of
+      project and extras only once, and skipping cyclic requirements
+    * Looking for missing eggs in the shared `egg_cache` directory, which
+      defaults to ``ZETUP_EGG_CACHE`` (see :class:`zetup.eggcache.EggCache`)
+    * Fetching other missing eggs level by level, concurrently within a
+      level, and storing them in the `egg_cache`
+    * Moving any fetched eggs to the front of ``sys.path``, in the order
+      their requirements were found
     * Updating ``pkg_resources.working_set`` accordingly
+
+    Returns a :class:`ResolvePlan` with details and timings. If `plan` is
+    set, nothing gets fetched and ``sys.path`` stays untouched, and the
+    returned plan shows what would be fetched
     """
     # don't pollute stdout! first backup
     __stdout__ = sys.__stdout__
     stdout = sys.stdout
     # then redirect to stderr...
     sys.stdout = sys.__stdout__ = StdErrWrapper()
+    egg_cache = egg_cache or os.environ.get('ZETUP_EGG_CACHE')
+    if egg_cache and not isinstance(egg_cache, EggCache):
+        egg_cache = EggCache(egg_cache)
+    try:
+        return _resolve(requirements, egg_cache, ResolvePlan(dry_run=plan))
+    finally:
+        # ... and finally restore stdout
+        sys.__stdout__ = __stdout__
+        sys.stdout = stdout
 
-    def _resolve(requirements, parent=None):
-        """
-        The actual recursive `requirements` resolver
 
-        `parent` string is used for printing fully qualified requirement
-        chains
-        """
-        for req in requirements:
-            qualreq = parent and '%s->%s' % (req, parent) or req
+def _resolve(requirements, egg_cache, plan):
+    """
+    The actual breadth-first `requirements` resolver, optionally using an
+    :class:`zetup.eggcache.EggCache`, and filling the given
+    :class:`ResolvePlan`
+    """
+    # triples of requirements, their fully qualified requirement chains,
+    # and their ancestors' keys for cycle detection
+    level = [(_requirement(req), None, ()) for req in requirements]
+    # requirements with other specs than their already planned nodes,
+    # to be checked against the finally resolved versions
+    duplicates = []
+    while level:
+        found = []
+        for req, parent, ancestors in level:
+            qualreq = parent and '%s->%s' % (req, parent) or str(req)
+            if req.key in ancestors:
+                print("Skipping cyclic setup requirement %s" % qualreq)
+                plan.cycles.append(qualreq)
+                continue
+
+            name = _node_name(req)
+            if name in plan:
+                if str(req) != plan[name]['requirement']:
+                    duplicates.append((req, qualreq, name))
+                continue
+
             print("Resolving setup requirement %s:" % qualreq)
+            start = time()
+            status = 'installed'
             try:
                 dist = get_distribution(req)
             except (DistributionNotFound, VersionConflict):
-                dist = INSTALLER(req)
+                dist = egg_cache and egg_cache.find(req)
+                status = 'cached' if dist is not None else 'fetch'
+            plan[name] = node = {
+                'requirement': str(req),
+                'chain': qualreq,
+                'status': status,
+                'requires': [],
+                'time': {'lookup': time() - start, 'fetch': 0.0},
+            }
+            found.append([req, dist, node, ancestors + (req.key, )])
+
+        missing = [item for item in found if item[2]['status'] != 'installed']
+        fetch = [item for item in missing if item[1] is None]
+        if plan.dry_run:
+            found = [item for item in found if item[1] is not None]
+        elif fetch:
+            results = _fetch([req for req, _, _, _ in fetch])
+            for item, (dist, seconds) in zip(fetch, results):
+                item[1] = dist
+                item[2]['status'] = 'fetched'
+                item[2]['time']['fetch'] = seconds
+                if egg_cache is not None:
+                    egg_cache.add(dist)
+        if not plan.dry_run:
+            for _, dist, _, _ in reversed(missing):
+                if dist.location in sys.path:
+                    sys.path.remove(dist.location)
                 sys.path.insert(0, dist.location)
                 working_set.add_entry(dist.location)
+
+        level = []
+        for req, dist, node, ancestors in found:
             print(repr(dist))
-            extras = re.match(r'[^#\[]*\[([^#\]]*)\]', req)
-            if extras:
-                extras = list(map(str.strip, extras.group(1).split(',')))
-            _resolve((str(req).split(';')[0]
-                      for req in dist.requires(extras=extras or ())),
-                     qualreq)
-
-    _resolve((str(req).split(';')[0] for req in requirements))
-    # ... and finally restore stdout
-    sys.__stdout__ = __stdout__
-    sys.stdout = stdout
+            node['version'] = dist.version
+            node['location'] = dist.location
+            subreqs = [_requirement(subreq)
+                       for subreq in dist.requires(extras=req.extras)]
+            node['requires'] = [_node_name(subreq) for subreq in subreqs]
+            level.extend(
+                (subreq, node['chain'], ancestors) for subreq in subreqs)
+
+    for node in plan.values():
+        node.setdefault('version', None)
+        node.setdefault('location', None)
+    for req, qualreq, name in duplicates:
+        version = plan[name]['version']
+        if version is not None and version not in req:
+            print("Conflicting setup requirement %s with %s %s" % (
+                qualreq, name, version))
+            plan.conflicts.append(qualreq)
+    return plan
@@ -0,0 +1,396 @@
+# ZETUP
+#
+# Zimmermann's Extensible Tools for Unified Project setups
+#
+# Copyright (C) 2014-2017 Stefan Zimmermann <user@zimmermann.co>
+#
+# ZETUP is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ZETUP is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with ZETUP. If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Project version resolution from git repositories
+
+Reads the ``HEAD`` commit, tags and the index directly from the repository
+files, without running any ``git`` subprocesses, and only asks
+``setuptools_scm`` for the version if there is no cached version for that
+commit and the version is not simply given by a release tag of a clean tree
+"""
+
+import os
+import re
+import zlib
+from struct import unpack_from, error as StructError
+
+from .cache import Cache
+
+__all__ = [
+    'find_git_dir', 'head', 'index', 'inputs', 'tag_version', 'get_version']
+
+
+#: Persistent cache of project versions by real project path
+VERSION_CACHE = Cache('version', disable_env='ZETUP_NO_VERSION_CACHE')
+
+#: The version part of tag names, like used by ``setuptools_scm``
+TAG_REGEX = re.compile(
+    r'^(?:[\w-]+-)?[vV]?(?P<version>\d+(?:\.\d+){0,2}[^\+]*)(?:\+.*)?$')
+
+#: Release versions which need no normalization by ``setuptools_scm``
+RELEASE_REGEX = re.compile(r'^(0|[1-9][0-9]*)(\.(0|[1-9][0-9]*))*$')
+
+#: The file mode of git submodule entries in the index
+GITLINK = 0o160000
+
+
+def _read(path):
+    """
+    Get stripped text content of file in `path` or ``None`` if not readable
+    """
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except (IOError, OSError):
+        return None
+
+
+def find_git_dir(path):
+    """
+    Find the git repository of a project directory in `path`
+
+    Also looks in parent directories. Returns a tuple of the git directory
+    and the common directory containing refs, which differ for additional
+    worktrees, or ``None`` if `path` is not in a git repository
+    """
+    dirs = _find_repo(path)
+    return dirs and dirs[1:]
+
+
+def _find_repo(path):
+    """
+    Like :func:`find_git_dir`, but with the worktree directory as additional
+    first tuple item
+    """
+    path = os.path.realpath(path)
+    while True:
+        gitdir = os.path.join(path, '.git')
+        if os.path.exists(gitdir):
+            break
+        parent = os.path.dirname(path)
+        if parent == path:  # ==> reached filesystem root
+            return None
+        path = parent
+
+    if not os.path.isdir(gitdir):  # ==> .git file of a worktree
+        text = _read(gitdir) or ''
+        if not text.startswith('gitdir:'):
+            return None
+        gitdir = os.path.join(path, text.split(':', 1)[1].strip())
+
+    commondir = _read(os.path.join(gitdir, 'commondir'))
+    if commondir:
+        commondir = os.path.join(gitdir, commondir)
+    return path, os.path.normpath(gitdir), os.path.normpath(
+        commondir or gitdir)
+
+
+def _resolve_ref(gitdir, commondir, ref):
+    """
+    Get the commit hash of symbolic `ref` like ``refs/heads/master``
+
+    Looks for loose ref files first and then in ``packed-refs``
+    """
+    for base in (gitdir, commondir):
+        commit = _read(os.path.join(base, *ref.split('/')))
+        if commit:
+            return commit
+
+    packed = _read(os.path.join(commondir, 'packed-refs')) or ''
+    for line in packed.split('\n'):
+        if line.endswith(' ' + ref):
+            return line.split(' ', 1)[0]
+
+    return None
+
+
+def head(path):
+    """
+    Get the ``HEAD`` commit hash of the git repository of project `path`
+
+    Returns ``None`` if not in a git repository or if ``HEAD`` points to
+    an unborn branch
+    """
+    dirs = find_git_dir(path)
+    if dirs is None:
+        return None
+
+    gitdir, commondir = dirs
+    text = _read(os.path.join(gitdir, 'HEAD'))
+    if not text:
+        return None
+
+    if text.startswith('ref:'):
+        return _resolve_ref(gitdir, commondir, text.split(':', 1)[1].strip())
+
+    return text  # ==> detached HEAD
+
+
+def _varint(data, pos):
+    """
+    Decode the variable-length offset integer at `pos` of bytearray `data`,
+    like used for path prefixes in version 4 git indexes
+
+    Returns the integer and the position after it
+    """
+    byte = data[pos]
+    pos += 1
+    value = byte & 0x7f
+    while byte & 0x80:
+        byte = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (byte & 0x7f)
+    return value, pos
+
+
+def index(gitdir):
+    """
+    Get the entries of the index of git directory `gitdir`
+
+    As a list of ``(path, mode, mtime, size)`` tuples, with worktree
+    relative ``/`` separated paths and ``(seconds, nanoseconds)`` mtimes.
+    Returns ``None`` if there is no readable index
+    """
+    try:
+        with open(os.path.join(gitdir, 'index'), 'rb') as f:
+            data = bytearray(f.read())
+    except (IOError, OSError):
+        return None
+
+    if data[:4] != b'DIRC':
+        return None
+
+    try:
+        version, count = unpack_from('>LL', data, 4)
+        if version not in (2, 3, 4):
+            return None
+
+        entries = []
+        pos = 12
+        path = b''
+        for _ in range(count):
+            mtime = unpack_from('>LL', data, pos + 8)
+            mode, = unpack_from('>L', data, pos + 24)
+            size, flags = unpack_from('>L20xH', data, pos + 36)
+            start = pos + 62
+            if flags & 0x4000:  # ==> extended flags
+                start += 2
+            if version == 4:  # ==> path with prefix of previous path
+                strip, start = _varint(data, start)
+                end = data.index(b'\0', start)
+                path = path[:len(path) - strip] + data[start:end]
+                pos = end + 1
+            else:  # ==> NUL padded to multiple of 8 bytes
+                end = data.index(b'\0', start)
+                path = data[start:end]
+                pos += (end - pos + 8) // 8 * 8
+            entries.append((bytes(path).decode('utf-8'), mode, mtime, size))
+    except (StructError, ValueError, UnicodeDecodeError):
+        return None
+
+    return entries
+
+
+def _modified(worktree, gitdir, entries):
+    """
+    Check if any of the index `entries` might be modified in `worktree`
+
+    Like git does, compares ``lstat`` data with the cached index data,
+    which is ambiguous for files changed after the index. Those are also
+    considered modified
+    """
+    stat = os.stat(os.path.join(gitdir, 'index'))
+    index_mtime = getattr(stat, 'st_mtime_ns', None) \
+        or int(stat.st_mtime * 1e9)
+    for path, mode, mtime, size in entries:
+        if mode & 0o170000 == GITLINK:
+            continue
+
+        try:
+            stat = os.lstat(os.path.join(worktree, *path.split('/')))
+        except OSError:
+            return True
+
+        stat_mtime = getattr(stat, 'st_mtime_ns', None) \
+            or int(stat.st_mtime * 1e9)
+        if stat.st_size & 0xffffffff != size \
+                or stat_mtime // 10 ** 9 != mtime[0] \
+                or mtime[1] and stat_mtime % 10 ** 9 != mtime[1] \
+                or stat_mtime >= index_mtime:
+            return True
+
+    return False
+
+
+def _peel(commondir, sha):
+    """
+    Get the commit hash a tag object `sha` points to
+
+    Only loose tag objects can be read. Returns `sha` itself for other
+    objects
+    """
+    try:
+        with open(os.path.join(
+                commondir, 'objects', sha[:2], sha[2:]), 'rb') as f:
+            data = zlib.decompress(f.read())
+    except (IOError, OSError, zlib.error):
+        return sha
+
+    header, _, body = data.partition(b'\0')
+    if header.startswith(b'tag ') and body.startswith(b'object '):
+        return body[7:47].decode('ascii')
+
+    return sha
+
+
+def _tags(commondir, commit):
+    """
+    Get the names of all tags pointing to `commit`
+    """
+    names = set()
+    packed = _read(os.path.join(commondir, 'packed-refs')) or ''
+    name = None
+    for line in packed.split('\n'):
+        if line.startswith('^'):  # ==> peeled commit of previous tag
+            if name is not None and line[1:] == commit:
+                names.add(name)
+            continue
+
+        sha, _, ref = line.partition(' ')
+        name = ref[10:] if ref.startswith('refs/tags/') else None
+        if name is not None and sha == commit:
+            names.add(name)
+
+    tagsdir = os.path.join(commondir, 'refs', 'tags')
+    for dirpath, _, fnames in os.walk(tagsdir):
+        for fname in fnames:
+            path = os.path.join(dirpath, fname)
+            sha = _read(path)
+            if sha and commit in (sha, _peel(commondir, sha)):
+                names.add(os.path.relpath(path, tagsdir).replace(
+                    os.path.sep, '/'))
+    return names
+
+
+def tag_version(path):
+    """
+    Get the version of the project in `path` from the tag of its ``HEAD``
+    commit, without ``setuptools_scm``
+
+    Only works for a clean tree, whose ``HEAD`` has exactly one tag with a
+    plain release version like ``1.0`` or ``v2.1.3``. Returns ``None`` in
+    all other cases, where ``setuptools_scm`` is needed
+    """
+    dirs = _find_repo(path)
+    commit = head(path)
+    if dirs is None or commit is None:
+        return None
+
+    worktree, gitdir, commondir = dirs
+    versions = set()
+    for name in _tags(commondir, commit):
+        match = TAG_REGEX.match(name)
+        if match:
+            versions.add(match.group('version'))
+    if len(versions) != 1:
+        return None
+
+    version, = versions
+    if not RELEASE_REGEX.match(version):
+        return None
+
+    entries = index(gitdir)
+    if entries is None or _modified(worktree, gitdir, entries):
+        return None
+
+    return version
+
+
+def inputs(path):
+    """
+    Get the paths of all git repository files whose changes can affect the
+    version of the project in `path`
+
+    Includes all files tracked in the index, since their modification
+    leads to a different version of the dirty tree. Returns ``None`` if not
+    in a git repository or if the index can't be read
+    """
+    dirs = _find_repo(path)
+    if dirs is None:
+        return None
+
+    worktree, gitdir, commondir = dirs
+    entries = index(gitdir)
+    if entries is None and os.path.exists(os.path.join(gitdir, 'index')):
+        return None
+
+    paths = [
+        os.path.join(gitdir, 'HEAD'),
+        os.path.join(gitdir, 'index'),
+        os.path.join(commondir, 'packed-refs'),
+        os.path.join(commondir, 'refs', 'tags'),
+    ]
+    text = _read(os.path.join(gitdir, 'HEAD')) or ''
+    if text.startswith('ref:'):
+        ref = text.split(':', 1)[1].strip().split('/')
+        paths += [os.path.join(gitdir, *ref), os.path.join(commondir, *ref)]
+    paths += [os.path.join(worktree, *entry[0].split('/'))
+              for entry in entries or ()]
+    return paths
+
+
+def _scm_version(root):
+    """
+    Get the version of project in `root` from ``setuptools_scm``
+
+    Raises ``ImportError`` if ``setuptools_scm`` is not installed
+    """
+    import setuptools_scm
+
+    version = setuptools_scm.get_version(root=root)
+    # the hyphen-revision-hash part after .dev# version strings
+    # results in wrong version comparisons
+    # via pkg_resources.parse_version()
+    return version and re.split('[-+]', version)[0]
+
+
+def get_version(root):
+    """
+    Get the version of the project in `root` from its repository
+
+    The version is cached by ``HEAD`` commit and gets invalidated by changes
+    of the git index, of tags and of any tracked files. Only on a cache miss,
+    it is taken from :func:`tag_version` or else derived via
+    ``setuptools_scm``, which raises ``ImportError`` if not installed
+    """
+    commit = head(root)
+    if commit is None:
+        return _scm_version(root)
+
+    key = os.path.realpath(root)
+    data = VERSION_CACHE.load(key)
+    if data is not None and data['head'] == commit:
+        return data['version']
+
+    version = tag_version(root) or _scm_version(root)
+    paths = inputs(root)
+    if paths is not None:
+        VERSION_CACHE.store(key, {'head': commit, 'version': version}, paths)
+    return version
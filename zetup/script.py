@@ -23,6 +23,7 @@ from __future__ import absolute_import, print_function
 
 import sys
 from itertools import chain
+from functools import partial
 from argparse import ArgumentParser
 import distutils.command
 
@@ -58,7 +59,7 @@ def run(argv=None, cmd=None):
     argv = sys.argv[1:] if argv is None else list(argv)
     if cmd:
         argv.insert(1, str(cmd))
-    args = PARSER.parse_args(argv)
+    args, rest = PARSER.parse_known_args(argv)
 
     exit_status = 0 # exit status of this script
     try:
@@ -71,8 +72,17 @@ def run(argv=None, cmd=None):
     else:
         if args.cmd in zfg.COMMANDS:
             cmdfunc = getattr(zfg, args.cmd)
+            if getattr(cmdfunc, 'args', None):
+                # ==> command has own options
+                cmdparser = ArgumentParser(prog='zetup %s' % args.cmd)
+                for arg in cmdfunc.args:
+                    cmdparser.add_argument(*arg[:-1], **arg[-1])
+                cmdfunc = partial(cmdfunc, cmdparser.parse_args(rest))
+                rest = []
         else: # ==> standard setup command
             sys.exit(zfg(subprocess=True))
+    if rest:
+        PARSER.error("unrecognized arguments: %s" % " ".join(rest))
 
     try:
         exit_status = cmdfunc()
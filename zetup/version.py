@@ -23,17 +23,39 @@ import sys
 if sys.version_info[0] == 3:
     unicode = str
 
-from pkg_resources import parse_version
+try:
+    from packaging.version import parse as _parse, InvalidVersion
+except ImportError:  # no standalone packaging
+    from pkg_resources import parse_version
+else:
+    def parse_version(version):
+        """Parse `version` with :func:`packaging.version.parse`.
+
+        - Falls back to :func:`pkg_resources.parse_version`
+          for legacy version strings not supported by newer packaging.
+        """
+        try:
+            return _parse(version)
+        except InvalidVersion:
+            from pkg_resources import parse_version
+            return parse_version(version)
 
 
 class Version(str):
     """Manage and compare version strings
-       using :func:`pkg_resources.parse_version`.
+       using :func:`packaging.version.parse`.
+
+    - The parsed version is cached on first use.
+    - Hashes are consistent with comparisons between :class:`Version`
+      instances, so equivalent versions like ``1.0`` and ``1.0.0``
+      are equal dictionary keys.
     """
     @staticmethod
     def _parsed(value):
         """Parse a version `value` if needed (if simple string).
         """
+        if isinstance(value, Version):
+            return value.parsed
         if isinstance(value, (str, unicode)):
             value = parse_version(value)
         return value
@@ -42,7 +64,32 @@ class Version(str):
     def parsed(self):
         """The version string as parsed version tuple.
         """
-        return parse_version(self)
+        try:
+            return self._parsed_version
+        except AttributeError:
+            self._parsed_version = parsed = parse_version(self)
+            return parsed
+
+    @classmethod
+    def sort(cls, versions, reverse=False):
+        """Get a sorted list of `versions`,
+           given as :class:`Version` instances or strings.
+
+        - Parses every version only once.
+        """
+        return sorted(versions, key=cls._parsed, reverse=reverse)
+
+    @classmethod
+    def max(cls, versions):
+        """Get the highest of `versions`,
+           given as :class:`Version` instances or strings.
+
+        - Parses every version only once.
+        """
+        return max(versions, key=cls._parsed)
+
+    def __hash__(self):
+        return hash(self.parsed)
 
     # Need to override all the compare methods
     #  (would otherwise be taken from str base)...
@@ -67,3 +114,11 @@ class Version(str):
     @property
     def py(self):
         return '%s(%s)' % (type(self).__name__, repr(str(self)))
+
+    @property
+    def snapshot(self):
+        return str(self)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, zfg=None):
+        return cls(snapshot)
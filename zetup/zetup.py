@@ -23,24 +23,84 @@ __all__ = ['Zetup', 'find_zetup_config']
 
 import sys
 import os
+import json
 from importlib import import_module
 from subprocess import call
-try:
-    from setuptools import setup, Command
-except ImportError: # fallback
-    # (setuptools should at least be available after package installation)
-    from distutils.core import setup, Command
 
-from .config import load_zetup_config, ZetupConfigNotFound
+from .config import (
+    load_zetup_config, ZetupConfigNotFound, SNAPSHOT_FORMAT)
+from .cache import unchanged
+
+
+def _setuptools():
+    """Get ``setup`` and ``Command`` from :mod:`setuptools`.
+
+    - Only imported on demand, since importing setuptools is slow.
+    """
+    try:
+        from setuptools import setup, Command
+    except ImportError: # fallback
+        # (setuptools should at least be available after package installation)
+        from distutils.core import setup, Command
+    return setup, Command
 
 
 class Zetup(object):
+    #: Process-wide registry of configs loaded via :meth:`.load`
+    #  by real paths of their ``ZETUP_DIR``
+    registry = {}
+
     def __init__(self, ZETUP_DIR='.'):
         """Load and store zetup config from `ZETUP_DIR`
            as attributes in `self`.
         """
         load_zetup_config(ZETUP_DIR, zfg=self)
 
+    @classmethod
+    def load(cls, ZETUP_DIR='.'):
+        """Get the zetup config from `ZETUP_DIR` from :attr:`.registry`
+           or load and register it if not loaded yet.
+
+        - Registered configs are reloaded if any of their files changed.
+        - Use ``Zetup.registry.clear()`` to drop all registered configs.
+        """
+        key = os.path.realpath(ZETUP_DIR)
+        zfg = cls.registry.get(key)
+        if not isinstance(zfg, cls):
+            zfg = cls.registry[key] = cls(ZETUP_DIR)
+        elif zfg.stale:
+            zfg.reload()
+        return zfg
+
+    @property
+    def stale(self):
+        """Check if any files the config was loaded from have changed.
+
+        - Always ``False`` if changes can't be detected
+          (see :func:`zetup.config.read_zetup_config`).
+        """
+        inputs = self.__dict__.get('ZETUP_INPUTS')
+        return inputs is not None and not unchanged(inputs)
+
+    def reload(self):
+        """Reload the zetup config from its ``ZETUP_DIR`` in place.
+        """
+        path = self.ZETUP_DIR
+        self.__dict__.clear()
+        load_zetup_config(path, zfg=self)
+
+    def __getattr__(self, name):
+        """Evaluate lazy config fields on first access.
+
+        - See :class:`zetup.config.LazyConfig`.
+        """
+        lazy = self.__dict__.get('ZETUP_LAZY')
+        if lazy is None:
+            raise AttributeError("%s has no attribute %s"
+                                 % (type(self).__name__, repr(name)))
+
+        return lazy.getattr(name)
+
     @property
     def config(self):
         """Get the zetup config as dictionary.
@@ -48,32 +108,99 @@ class Zetup(object):
         - Actually just return self.__dict__ because all attr assignments
           come from :func:`.config.load_zetup_config` in :meth:`.__init__`
           and are therefore just the config.
+        - Evaluates all remaining lazy config fields first.
         """
+        self.__dict__['ZETUP_LAZY'].evaluate_all()
         return self.__dict__
 
     def __getitem__(self, name):
-        return self.config[name]
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name)
 
     @property
     def config_py(self):
         """Get the zetup config as Python code for writing to a .py module.
+
+        - Values that are created from Python code of their ``.py``
+          attributes are defined as lazy fields
+          (see :class:`zetup.config.LazyConfig`).
         """
+        lazy = []
+
         def items():
             # always start with project name
             yield "NAME = %s" % (repr(self.config['NAME']))
-            for name, value in self.config.items():
+            for name, value in sorted(self.config.items()):
                 if name in [
                         'NAME', 'NOTEBOOKS',
                 ] or name.startswith('ZETUP') or name.endswith('FILE'):
                     continue
                 try:
-                    py = value.py
+                    lazy.append((name, value.py))
                 except AttributeError:
-                    py = repr(value)
-                yield "%s = %s" % (name, py)
+                    yield "%s = %s" % (name, repr(value))
+
+            yield "LazyConfig(zfg, [\n%s\n])" % "\n".join(
+                "    (%s, lambda: %s)," % (repr(name), py)
+                for name, py in lazy)
 
         return '\n\n'.join(items())
 
+    @property
+    def config_snapshot(self):
+        """Get the fully resolved zetup config as JSON-serializable snapshot
+           for writing to a data file.
+
+        - Values with ``.snapshot`` attributes are stored
+          together with their type names
+          and recreated from their snapshots on loading
+          (see :func:`zetup.config.load_zetup_config_snapshot`).
+        """
+        fields = {}
+        objects = {}
+        for name, value in self.config.items():
+            if name == 'NOTEBOOKS' or name.startswith('ZETUP') \
+                    or name.endswith('FILE'):
+                continue
+            try:
+                objects[name] = [type(value).__name__, value.snapshot]
+            except AttributeError:
+                fields[name] = value
+        return {
+            'format': SNAPSHOT_FORMAT,
+            'module': self.ZETUP_CONFIG_MODULE,
+            'fields': fields,
+            'objects': objects,
+        }
+
+    @property
+    def config_json(self):
+        """Get :attr:`.config_snapshot` as compact JSON text.
+        """
+        return json.dumps(
+            self.config_snapshot, sort_keys=True, separators=(',', ':'))
+
+    @property
+    def loads_config_snapshot(self):
+        """Does the zetup config module load a ``zetup_config.json``?
+
+        - Decided from the already made module itself if existing,
+          since ``zetup make zetup_config_snapshot`` doesn't depend on the
+          ``zetup config snapshot`` option.
+        - Otherwise decided from that option.
+        """
+        if not self.ZETUP_CONFIG_MODULE or self.ZETUP_CONFIG_PACKAGE:
+            return False
+        path = os.path.join(
+            self.ZETUP_DIR, *self.ZETUP_CONFIG_MODULE.split('.')) + '.py'
+        try:
+            with open(path) as f:
+                return 'load_zetup_config_snapshot' in f.read()
+        except (IOError, OSError):
+            return bool(self.ZETUP_CONFIG_SNAPSHOT)
+
     def setup_keywords(self):
         """Get a dictionary of `setup()` keywords generated from zetup config.
         """
@@ -120,6 +247,11 @@ class Zetup(object):
             keywords['package_dir'][self.ZETUP_CONFIG_PACKAGE] = '.'
             keywords['package_data'][self.ZETUP_CONFIG_PACKAGE] \
               = self.ZETUP_DATA
+        elif self.loads_config_snapshot:
+            # install the data file loaded by the zetup config module
+            pkg = self.ZETUP_CONFIG_MODULE.rsplit('.', 1)[0]
+            keywords['package_data'].setdefault(pkg, []).append(
+                'zetup_config.json')
         if self.SCRIPTS:
             entry_points = keywords['entry_points'].setdefault(
                 'console_scripts', [])
@@ -131,6 +263,7 @@ class Zetup(object):
             for name, source in self.SETUP_KEYWORDS.items():
                 entry_points.append('%s = %s' % (name, source))
         cmdclasses = {}
+        _, Command = _setuptools()
         for cmdname in self.COMMANDS:
             cmdmethod = getattr(self, cmdname)
 
@@ -193,6 +326,7 @@ class Setup(dict):
           (see :meth:`Zetup.__call__` for details)
         """
         keywords = dict(self, **keywords)
+        setup, _ = _setuptools()
         if 'make' in Zetup.COMMANDS:
             make_targets = ['VERSION', 'setup.py', 'zetup_config']
             with self.zfg.make(targets=make_targets):
@@ -257,7 +391,7 @@ def find_zetup_config(pkgname):
         # move further up the dir tree for every prefix (namespace) package
         path = os.path.dirname(path)
     try:
-        return Zetup(path)
+        return Zetup.load(path)
     except ZetupConfigNotFound as e:
         raise ZetupConfigNotFound(
             "No '%s.zetup_config' module and: %s" % (pkgname, e))